@@ -393,6 +393,12 @@ install_deps() {
         pip3 install -q beautifulsoup4 lxml 2>/dev/null || true
     fi
     
+    # orjson 可选，用于加速 JSON 读写（缺失时回退标准库）
+    if ! python3 -c "import orjson" &>/dev/null; then
+        pip3 install --break-system-packages -q orjson 2>/dev/null || \
+        pip3 install -q orjson 2>/dev/null || true
+    fi
+    
     # feedparser 用于 RSS 订阅
     if ! python3 -c "import feedparser" &>/dev/null; then
         pip3 install --break-system-packages -q feedparser 2>/dev/null || \
@@ -14,12 +14,13 @@ PT上传速度精准控制器
 
 import os
 import sys
+import copy
 import time
 import signal
 import queue
 import threading
-from typing import Dict, Optional, List, Any
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, List
 
 import qbittorrentapi
 from qbittorrentapi.exceptions import APIConnectionError, LoginFailed
@@ -30,7 +31,7 @@ from qsl import (
     SubscriptionModule, CleanupModule,
     get_logger, reinit_logger, fmt_size, fmt_speed, fmt_duration, precision_tracker
 )
-from qsl.utils import safe_div, wall_time
+from qsl.utils import safe_div, wall_time, get_phase, TRow
 
 
 class Controller:
@@ -52,6 +53,12 @@ class Controller:
         self.config = cfg
         self.config_path = path
         self.last_config_check = wall_time()
+        self._config_version = 0
+        
+        # 有效目标速度缓存，(临时目标版本, 配置版本) 变化时重算
+        self._target_key: tuple = ()
+        self._target_cache = 0
+        self._max_phy_cache = 0
         
         # 重新设置日志
         self.logger = reinit_logger(cfg.log_level)
@@ -92,22 +99,34 @@ class Controller:
         self.modified_up: set = set()
         self.modified_dl: set = set()
         
-        # API 限速
-        self._api_times: deque = deque(maxlen=200)
+        # API 限速（固定大小时间戳环，槽位数 = 每秒上限）
+        self._api_ring: List[float] = []
+        self._api_head = 0
+        
+        # qB API 并发池（批量下发限速等互不依赖的请求）
+        self._api_pool = ThreadPoolExecutor(max_workers=C.API_WORKERS, thread_name_prefix="QB-API")
         
-        # TID 搜索队列
+        # TID 搜索队列 + U2 请求线程池
         self._pending_tid_searches: queue.Queue = queue.Queue()
+        self._u2_pool = ThreadPoolExecutor(max_workers=C.U2_WORKERS, thread_name_prefix="U2")
         threading.Thread(target=self._tid_search_worker, daemon=True, name="TID-Search").start()
         
-        # 数据库保存定时器
+        # 数据库保存定时器 + 写入线程（保存不阻塞主循环）
         self._last_db_save = wall_time()
+        self._db_queue: queue.Queue = queue.Queue(maxsize=4)
+        self._db_thread = threading.Thread(target=self._db_writer, daemon=True, name="DB-Writer")
+        self._db_thread.start()
         
         # Cookie 检查
         self._last_cookie_check = 0
         
+        # 主循环等待事件（关闭时置位可立即唤醒）
+        self._wake = threading.Event()
+        
         # 信号处理
-        signal.signal(signal.SIGINT, lambda *_: self._shutdown())
-        signal.signal(signal.SIGTERM, lambda *_: self._shutdown())
+        self._closed = False
+        signal.signal(signal.SIGINT, self._on_signal)
+        signal.signal(signal.SIGTERM, self._on_signal)
     
     def _init_modules(self):
         """初始化订阅和删种模块（需要qb client连接后）"""
@@ -138,15 +157,34 @@ class Controller:
         except Exception as e:
             self.logger.error(f"删种模块初始化失败: {e}")
             self.cleanup_module = None
+        
+        # 订阅新增种子会占用空间，添加后立即唤醒删种检查
+        if self.subscription_module and self.cleanup_module:
+            self.subscription_module.on_added = self.cleanup_module.wake
     
     def _tid_search_worker(self):
-        """TID 搜索后台线程"""
-        while self.running:
+        """TID 搜索后台线程（批量取出，经 U2 线程池并发查询）"""
+        while True:
+            # 无任务时阻塞等待，关闭时由 None 唤醒退出
+            batch = [self._pending_tid_searches.get()]
+            while len(batch) < C.TID_SEARCH_BATCH:
+                try:
+                    batch.append(self._pending_tid_searches.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch or not self.running:
+                break
+            if not self.u2_helper:
+                continue
+            
             try:
-                item = self._pending_tid_searches.get(timeout=5)
-                if item and self.u2_helper:
-                    h, state = item
-                    result = self.u2_helper.search_tid_by_hash(h)
+                futures = [(state, self._u2_pool.submit(self.u2_helper.search_tid_by_hash, h))
+                           for h, state in batch]
+            except RuntimeError:
+                break  # 关闭过程中线程池已停止
+            for state, fut in futures:
+                try:
+                    result = fut.result()
                     if result:
                         tid, publish_time, promo = result
                         state.tid = tid
@@ -158,15 +196,26 @@ class Controller:
                         state.tid_not_found = True
                         state.tid_searched = True
                         state.promotion = "无优惠"
-            except queue.Empty:
-                pass
-            except Exception as e:
-                self.logger.debug(f"TID搜索异常: {e}")
+                except Exception as e:
+                    self.logger.debug("TID搜索异常: %s", e)
+    
+    def _on_signal(self, signum, frame):
+        """信号处理：只中断主线程当前的调用（含阻塞中的 HTTP 请求），收尾统一由 run 完成"""
+        if not self.running:
+            return  # 关闭过程中的重复信号忽略，避免重入 _shutdown
+        self.running = False
+        self._wake.set()
+        raise SystemExit(0)
     
     def _shutdown(self):
         """优雅关闭"""
+        if self._closed:
+            return
+        self._closed = True
         self.logger.info("🛑 正在停止服务...")
         self.running = False
+        self._wake.set()
+        self._pending_tid_searches.put_nowait(None)
         
         # 停止订阅模块
         if self.subscription_module:
@@ -176,8 +225,13 @@ class Controller:
         if self.cleanup_module:
             self.cleanup_module.stop()
         
-        # 保存所有状态到数据库
-        self._save_all_to_db()
+        # 保存所有状态到数据库（经写入线程排队，保证晚于已排队的快照落盘）
+        self._save_all_to_db(block=True)
+        try:
+            self._db_queue.put(None, timeout=5)
+            self._db_thread.join(timeout=10)
+        except queue.Full:
+            pass
         
         # 发送关闭通知
         self.notifier.shutdown_report()
@@ -191,23 +245,35 @@ class Controller:
                     self.client.torrents_set_download_limit(-1, list(self.modified_dl))
             except:
                 pass
+        self._api_pool.shutdown(wait=False, cancel_futures=True)
+        self._u2_pool.shutdown(wait=False, cancel_futures=True)
         
         # 关闭资源
         if self.u2_helper:
             self.u2_helper.close()
         self.notifier.close()
-        
-        sys.exit(0)
     
-    def _save_all_to_db(self):
-        """保存所有状态到数据库"""
+    def _save_all_to_db(self, block: bool = False):
+        """保存所有状态到数据库（快照交给写入线程执行）"""
+        snapshot = ([s.to_db_row() for s in list(self.states.values())], copy.copy(self.stats))
         try:
-            for state in self.states.values():
-                self.db.save_torrent_state(state)
-            self.db.save_stats(self.stats)
-            self.logger.debug("💾 状态已保存到数据库")
-        except Exception as e:
-            self.logger.error(f"保存数据库失败: {e}")
+            self._db_queue.put(snapshot, block=block, timeout=10 if block else None)
+        except queue.Full:
+            self.logger.debug("数据库写入队列已满，跳过本次保存")
+    
+    def _db_writer(self):
+        """数据库写入线程"""
+        while True:
+            item = self._db_queue.get()
+            if item is None:
+                break
+            rows, stats = item
+            try:
+                self.db.save_torrent_rows(rows)
+                self.db.save_stats(stats)
+                self.logger.debug("💾 状态已保存到数据库")
+            except Exception as e:
+                self.logger.error(f"保存数据库失败: {e}")
     
     def _check_config(self, now: float):
         """检查配置更新"""
@@ -221,6 +287,7 @@ class Controller:
                 new_cfg, err = Config.load(self.config_path, self.db)
                 if not err:
                     self.config = new_cfg
+                    self._config_version += 1
                     self.logger.info("📝 配置已重新加载")
         except:
             pass
@@ -247,7 +314,10 @@ class Controller:
                     username=self.config.username,
                     password=self.config.password,
                     VERIFY_WEBUI_CERTIFICATE=False,
-                    REQUESTS_ARGS={'timeout': (5, 15)}
+                    REQUESTS_ARGS={'timeout': (5, 15)},
+                    # 连接池需容纳 API 并发池的全部线程，否则多余连接用完即弃、每次重新握手
+                    HTTPADAPTER_ARGS={'pool_connections': 1, 'pool_maxsize': C.API_WORKERS + 2,
+                                      'pool_block': False}
                 )
                 self.client.auth_log_in()
                 self.qb_version = self.client.app.version
@@ -269,32 +339,56 @@ class Controller:
         limit = self.config.api_rate_limit
         if limit <= 0:
             return True
-        while self._api_times and now - self._api_times[0] > 1:
-            self._api_times.popleft()
-        if len(self._api_times) >= limit:
+        ring = self._api_ring
+        if len(ring) != limit:
+            ring = self._api_ring = [0.0] * limit
+            self._api_head = 0
+        # 最旧的槽位仍在 1 秒内，说明这一秒已用满
+        head = self._api_head
+        if now - ring[head] <= 1:
             return False
-        self._api_times.append(now)
+        ring[head] = now
+        self._api_head = (head + 1) % limit
         return True
     
-    def _get_props(self, h: str, state: TorrentState, now: float, force: bool = False) -> Optional[dict]:
-        """获取种子属性"""
-        phase = state.get_phase(now)
-        cache = C.PROPS_CACHE.get(phase, 1.0)
-        if not force and state.last_props > 0 and now - state.last_props < cache:
-            return None
-        if not force and not self._api_ok(now):
-            return None
-        try:
-            props = self.client.torrents_properties(torrent_hash=h)
-            state.last_props = now
-            return props
-        except Exception as e:
-            self.logger.debug(f"获取属性失败: {e}")
-            return None
+    def _fetch_props(self, torrents: List[TRow], now: float) -> Dict[str, dict]:
+        """批量并发获取本周期需要刷新的种子属性（按阶段缓存 + API 限速预算；torrents 已按 ACTIVE 和 tracker 过滤）"""
+        need = []
+        for t in torrents:
+            state = self.states.get(t.hash)
+            if state and state.last_props > 0:
+                cache = C.PROPS_CACHE.get(state.get_phase(now), 1.0)
+                if now - state.last_props < cache:
+                    continue
+            if not self._api_ok(now):
+                break
+            need.append(t.hash)
+        
+        futures = [(h, self._api_pool.submit(self.client.torrents_properties, torrent_hash=h)) for h in need]
+        props_map: Dict[str, dict] = {}
+        for h, fut in futures:
+            try:
+                props_map[h] = fut.result()
+            except Exception as e:
+                self.logger.debug("获取属性失败: %s", e)
+        return props_map
+    
+    def _apply_limits(self, up_actions: Dict[int, List[str]], dl_actions: Dict[int, List[str]]):
+        """并发下发限速，周期耗时由各请求 RTT 之和降为最大值"""
+        jobs = [(self.client.torrents_set_upload_limit, limit, hashes, "上传")
+                for limit, hashes in up_actions.items()]
+        jobs += [(self.client.torrents_set_download_limit, limit, hashes, "下载")
+                 for limit, hashes in dl_actions.items()]
+        futures = [(kind, self._api_pool.submit(fn, limit, hashes)) for fn, limit, hashes, kind in jobs]
+        for kind, fut in futures:
+            try:
+                fut.result()
+            except Exception as e:
+                self.logger.debug("设置%s限速失败: %s", kind, e)
     
-    def _should_manage(self, torrent: Any) -> bool:
+    def _should_manage(self, row: TRow) -> bool:
         """检查是否需要管理该种子"""
-        tracker = getattr(torrent, 'tracker', '') or ''
+        tracker = row.tracker
         if self.config.exclude_tracker_keyword and self.config.exclude_tracker_keyword in tracker:
             return False
         if self.config.target_tracker_keyword and self.config.target_tracker_keyword not in tracker:
@@ -336,9 +430,14 @@ class Controller:
                     if 'uploaded' in info:
                         state.peer_list_uploaded = info['uploaded']
             except Exception as e:
-                self.logger.debug(f"peer list 检查失败: {e}")
+                self.logger.debug("peer list 检查失败: %s", e)
         
-        threading.Thread(target=check, daemon=True).start()
+        if not self.running:
+            return
+        try:
+            self._u2_pool.submit(check)
+        except RuntimeError:
+            pass  # 关闭过程中线程池已停止
     
     def _do_reannounce(self, state: TorrentState, reason: str):
         """执行强制汇报"""
@@ -351,23 +450,30 @@ class Controller:
             self.logger.warning(f"[{state.name[:16]}] 🔄 强制汇报: {reason}")
             self.notifier.reannounce_notify(state.name, reason, state.tid)
         except Exception as e:
-            self.logger.debug(f"强制汇报失败: {e}")
+            self.logger.debug("强制汇报失败: %s", e)
     
     def _get_effective_target(self) -> int:
         """获取有效的目标速度（考虑临时修改）"""
-        if self.notifier.temp_target_kib:
-            return int(self.notifier.temp_target_kib * 1024 * self.config.safety_margin)
-        return self.config.target_bytes
+        key = (self.notifier.target_version, self._config_version)
+        if key != self._target_key:
+            if self.notifier.temp_target_kib:
+                self._target_cache = int(self.notifier.temp_target_kib * 1024 * self.config.safety_margin)
+            else:
+                self._target_cache = self.config.target_bytes
+            self._max_phy_cache = self.config.max_physical_bytes
+            self._target_key = key
+        return self._target_cache
     
-    def _calc_upload_limit(self, state: TorrentState, torrent: Any, now: float, tl: float) -> tuple:
-        """计算上传限速"""
+    def _calc_upload_limit(self, state: TorrentState, row: TRow, now: float, tl: float,
+                           phase: str, elapsed: float, precision_adj: float) -> tuple:
+        """计算上传限速，返回 (limit, reason, forced)；forced 为必须下发的硬性限速（不做滞回）"""
         if self.notifier.paused:
-            return -1, "已暂停"
+            return -1, "已暂停", False
         
         target = self._get_effective_target()
-        max_phy = self.config.max_physical_bytes
-        current = getattr(torrent, 'upspeed', 0) or 0
-        total_uploaded = getattr(torrent, 'uploaded', 0) or 0
+        max_phy = self._max_phy_cache
+        current = row.up_speed
+        total_uploaded = row.uploaded
         
         state.limit_controller.record_speed(now, current)
         real_speed = state.get_real_avg_speed(total_uploaded)
@@ -376,15 +482,12 @@ class Controller:
         if real_speed > C.SPEED_LIMIT * 1.05:
             self.logger.warning(f"[{state.name[:15]}] ⚠️ 超速 {fmt_speed(real_speed)}!")
             self.notifier.overspeed_warning(state.name, real_speed, target, state.tid)
-            return C.MIN_LIMIT, "超速刹车"
+            return C.MIN_LIMIT, "超速刹车", True
         
         if state.waiting_reannounce:
-            return C.REANNOUNCE_WAIT_LIMIT * 1024, "等待汇报"
+            return C.REANNOUNCE_WAIT_LIMIT * 1024, "等待汇报", True
         
-        elapsed = state.elapsed(now)
         uploaded = state.uploaded_in_cycle(total_uploaded)
-        phase = state.get_phase(now)
-        precision_adj = precision_tracker.get_adjustment(phase)
         
         limit, reason, debug = state.limit_controller.calculate(
             target=target, uploaded=uploaded, time_left=tl,
@@ -392,12 +495,14 @@ class Controller:
         )
         state.last_debug = debug
         
-        # 物理限速
+        # 物理限速（当前限速高于上限时必须压下来）
+        forced = False
         if max_phy > 0:
-            if limit == -1:
-                limit = int(max_phy)
-            elif limit > max_phy:
+            if limit == -1 or limit > max_phy:
                 limit = int(max_phy)
+                forced = True
+            elif row.up_limit > max_phy:
+                forced = True
         
         # 进度保护
         progress = safe_div(uploaded, target * state.estimate_total(now, tl), 0)
@@ -406,45 +511,36 @@ class Controller:
             if limit == -1 or limit > protect:
                 limit = protect
                 reason = f"保护"
+                forced = True
         
-        return limit, reason
+        return limit, reason, forced
     
-    def _calc_download_limit(self, state: TorrentState, torrent: Any, now: float) -> tuple:
+    def _calc_download_limit(self, state: TorrentState, row: TRow, now: float) -> tuple:
         """计算下载限速"""
         if not self.config.enable_dl_limit or self.notifier.paused:
             return -1, ""
         
-        total_uploaded = getattr(torrent, 'uploaded', 0) or 0
-        total_done = getattr(torrent, 'completed', 0) or getattr(torrent, 'downloaded', 0) or 0
-        total_size = getattr(torrent, 'total_size', 0) or state.total_size or 0
-        eta = getattr(torrent, 'eta', 0) or 0
-        up_speed = getattr(torrent, 'upspeed', 0) or 0
-        dl_speed = getattr(torrent, 'dlspeed', 0) or 0
-        
+        total_size = row.total_size or state.total_size or 0
         if total_size <= 0:
             return -1, ""
         
-        torrent_state = getattr(torrent, 'state', '')
-        if 'download' not in torrent_state.lower() and 'stalled' not in torrent_state.lower():
+        torrent_state = row.state.lower()
+        if 'download' not in torrent_state and 'stalled' not in torrent_state:
             if state.last_dl_limit > 0:
                 return -1, "完成"
             return -1, ""
         
         return DownloadLimiter.calc_dl_limit(
-            state, total_uploaded, total_done, total_size, eta, up_speed, dl_speed, now
+            state, row.uploaded, row.completed, total_size, row.eta, row.up_speed, row.dl_speed, now
         )
     
-    def _check_reannounce(self, state: TorrentState, torrent: Any, now: float):
+    def _check_reannounce(self, state: TorrentState, row: TRow, now: float):
         """检查是否需要强制汇报"""
         if not self.config.enable_reannounce_opt or self.notifier.paused:
             return
         
-        total_uploaded = getattr(torrent, 'uploaded', 0) or 0
-        total_done = getattr(torrent, 'completed', 0) or getattr(torrent, 'downloaded', 0) or 0
-        total_size = getattr(torrent, 'total_size', 0) or state.total_size or 0
-        up_speed = getattr(torrent, 'upspeed', 0) or 0
-        dl_speed = getattr(torrent, 'dlspeed', 0) or 0
-        
+        total_uploaded = row.uploaded
+        total_size = row.total_size or state.total_size or 0
         if total_size <= 0:
             return
         
@@ -455,12 +551,12 @@ class Controller:
                 return
         
         should, reason = ReannounceOptimizer.should_reannounce(
-            state, total_uploaded, total_done, total_size, up_speed, dl_speed, now
+            state, total_uploaded, row.completed, total_size, row.up_speed, row.dl_speed, now
         )
         if should:
             self._do_reannounce(state, reason)
     
-    def _report(self, state: TorrentState, torrent: Any, now: float):
+    def _report(self, state: TorrentState, row: TRow, now: float):
         """周期汇报"""
         if state.report_sent:
             return
@@ -468,7 +564,7 @@ class Controller:
         
         target = self._get_effective_target()
         duration = max(1, state.elapsed(now))
-        total_uploaded = getattr(torrent, 'uploaded', 0) or 0
+        total_uploaded = row.uploaded
         uploaded = state.uploaded_in_cycle(total_uploaded)
         speed = safe_div(uploaded, duration, 0)
         ratio = safe_div(speed, target, 0)
@@ -478,9 +574,9 @@ class Controller:
         precision_tracker.record(ratio, phase, now)
         self.stats.record(ratio, uploaded)
         
-        total_size = getattr(torrent, 'total_size', 0) or state.total_size
-        total_done = getattr(torrent, 'completed', 0) or getattr(torrent, 'downloaded', 0) or 0
-        progress_pct = safe_div(total_done, total_size, 0) * 100 if total_size > 0 else 0
+        total_size = row.total_size or state.total_size
+        total_done = row.completed
+        progress_pct = row.progress * 100 if total_size > 0 else 0
         
         dev = abs(ratio - 1)
         if dev <= C.PRECISION_PERFECT:
@@ -498,10 +594,10 @@ class Controller:
         if state.reannounced_this_cycle:
             extra += " 🔄"
         
-        self.logger.info(f"[{torrent.name[:16]}] {g} 汇报 ↑{fmt_speed(speed)}({ratio*100:.1f}%){extra}")
+        self.logger.info(f"[{row.name[:16]}] {g} 汇报 ↑{fmt_speed(speed)}({ratio*100:.1f}%){extra}")
         
         self.notifier.cycle_report({
-            'name': torrent.name, 'hash': state.hash,
+            'name': row.name, 'hash': state.hash,
             'speed': speed, 'real_speed': real_speed, 'target': target,
             'ratio': ratio, 'uploaded': uploaded, 'duration': duration,
             'idx': state.cycle_index, 'tid': state.tid,
@@ -509,18 +605,16 @@ class Controller:
             'total_downloaded_life': total_done, 'progress_pct': progress_pct
         })
     
-    def _process(self, torrent: Any, now: float, up_actions: Dict[int, List[str]], 
-                 dl_actions: Dict[int, List[str]]) -> float:
-        """处理单个种子"""
-        h = torrent.hash
-        if not self._should_manage(torrent):
-            return 9999
-        
-        total_uploaded = getattr(torrent, 'uploaded', 0) or 0
-        total_downloaded = getattr(torrent, 'completed', 0) or getattr(torrent, 'downloaded', 0) or 0
-        time_added = getattr(torrent, 'added_on', 0) or 0
-        up_speed = getattr(torrent, 'upspeed', 0) or 0
-        dl_speed = getattr(torrent, 'dlspeed', 0) or 0
+    def _process(self, row: TRow, now: float, props: Optional[dict],
+                 up_actions: Dict[int, List[str]], dl_actions: Dict[int, List[str]]) -> float:
+        """处理单个种子（调用方已按 _should_manage 过滤）"""
+        h = row.hash
+        
+        total_uploaded = row.uploaded
+        total_downloaded = row.completed
+        time_added = row.added_on
+        up_speed = row.up_speed
+        dl_speed = row.dl_speed
         
         # 初始化或恢复状态
         if h not in self.states:
@@ -529,11 +623,11 @@ class Controller:
             db_data = self.db.load_torrent_state(h)
             if db_data:
                 state.load_from_db(db_data)
-                self.logger.info(f"📦 恢复种子状态: {torrent.name[:20]} (周期#{state.cycle_index})")
+                self.logger.info(f"📦 恢复种子状态: {row.name[:20]} (周期#{state.cycle_index})")
             
             state.time_added = time_added
             state.initial_uploaded = total_uploaded
-            state.total_size = getattr(torrent, 'total_size', 0) or 0
+            state.total_size = row.total_size
             
             if state.session_start_time <= 0:
                 state.total_uploaded_start = total_uploaded
@@ -542,19 +636,19 @@ class Controller:
             self.states[h] = state
         
         state = self.states[h]
-        state.name = torrent.name
+        state.name = row.name
         
         if state.total_size <= 0:
-            state.total_size = getattr(torrent, 'total_size', 0) or 0
+            state.total_size = row.total_size
         
         state.speed_tracker.record(now, total_uploaded, total_downloaded, up_speed, dl_speed)
         
         self._maybe_check_peer_list(state, now)
         
-        props = self._get_props(h, state, now)
         tl = state.get_tl(now)
         
         if props:
+            state.last_props = now
             ra = props.get('reannounce', 0) or 0
             if 0 < ra < C.MAX_REANNOUNCE:
                 state.cached_tl = ra
@@ -562,7 +656,7 @@ class Controller:
                 if not state.last_announce_time:
                     tl = ra
         
-        current_up_limit = getattr(torrent, 'up_limit', -1) or -1
+        current_up_limit = row.up_limit
         
         is_jump = state.cycle_start > 0 and tl > state.prev_tl + 30
         
@@ -571,46 +665,49 @@ class Controller:
             wait_timeout = (now - state.session_start_time) > 60
             if state.tid_searched or (not self.u2_helper) or wait_timeout:
                 self.notifier.monitor_start({
-                    'hash': h, 'name': torrent.name, 'total_size': state.total_size,
+                    'hash': h, 'name': row.name, 'total_size': state.total_size,
                     'target': self._get_effective_target(), 'tid': state.tid,
                     'promotion': state.promotion
                 })
                 state.monitor_notified = True
         
-        progress_val = safe_div(total_downloaded, state.total_size, 0)
         self.notifier.check_finish({
-            'hash': h, 'name': torrent.name, 'progress': progress_val,
+            'hash': h, 'name': row.name, 'progress': row.progress,
             'total_uploaded': total_uploaded, 'total_downloaded': total_downloaded
         })
         
         if state.cycle_start == 0 or is_jump:
             if is_jump:
-                self._report(state, torrent, now)
+                self._report(state, row, now)
             state.new_cycle(now, total_uploaded, tl, is_jump)
             tid_info = f" tid={state.tid}" if state.tid else ""
             sync_status = '✅同步' if state.cycle_synced else '⏳预热'
-            self.logger.info(f"[{torrent.name[:16]}] 🔄 周期 #{state.cycle_index} {sync_status}{tid_info}")
+            self.logger.info(f"[{row.name[:16]}] 🔄 周期 #{state.cycle_index} {sync_status}{tid_info}")
         
         state.prev_tl = tl
         
-        up_limit, up_reason = self._calc_upload_limit(state, torrent, now, tl)
-        dl_limit, dl_reason = self._calc_download_limit(state, torrent, now)
+        # 阶段相关量每个种子每周期只算一次
+        phase = get_phase(tl, state.cycle_synced)
+        elapsed = state.elapsed(now)
+        precision_adj = precision_tracker.get_adjustment(phase)
+        
+        up_limit, up_reason, up_forced = self._calc_upload_limit(state, row, now, tl, phase, elapsed, precision_adj)
+        dl_limit, dl_reason = self._calc_download_limit(state, row, now)
         
-        self._check_reannounce(state, torrent, now)
+        self._check_reannounce(state, row, now)
         
         if now - state.last_log > C.LOG_INTERVAL or state.last_log_limit != up_limit:
             uploaded = state.uploaded_in_cycle(total_uploaded)
             target = self._get_effective_target()
             total = state.estimate_total(now, tl)
             progress = safe_div(uploaded, target * total, 0) * 100
-            phase = state.get_phase(now)
             debug = state.last_debug
             pid_out = debug.get('pid_output', 1) if debug else 1
             
             limit_str = 'MAX' if up_limit == -1 else f'{up_limit//1024}K'
             dl_info = f" 📥{dl_limit}K" if dl_limit > 0 else ""
             
-            self.logger.info(f"[{torrent.name[:12]}] ↑{up_speed/1024:.0f}K ({progress:.0f}%) "
+            self.logger.info(f"[{row.name[:12]}] ↑{up_speed/1024:.0f}K ({progress:.0f}%) "
                        f"⏱{tl:.0f}s [{phase[0].upper()}] → {limit_str} ({up_reason}) PID={pid_out:.2f}{dl_info}")
             
             state.last_log = now
@@ -619,7 +716,12 @@ class Controller:
         state.last_up_limit = up_limit
         state.last_up_reason = up_reason
         
-        if up_limit != current_up_limit:
+        changed = up_limit != current_up_limit
+        if changed and not up_forced and phase != C.PHASE_FINISH and up_limit > 0 and current_up_limit > 0:
+            # 滞回：小幅抖动不下发，减少 API 调用（硬性限速始终下发）
+            changed = abs(up_limit - current_up_limit) > max(
+                C.LIMIT_HYSTERESIS, current_up_limit * C.LIMIT_HYSTERESIS_RATIO)
+        if changed:
             up_actions.setdefault(up_limit, []).append(h)
             self.modified_up.add(h)
         
@@ -627,10 +729,10 @@ class Controller:
             if dl_limit > 0:
                 state.dl_limited_this_cycle = True
                 if state.last_dl_limit <= 0:
-                    self.logger.warning(f"[{torrent.name[:16]}] 📥 下载限速: {dl_limit}K")
-                    self.notifier.dl_limit_notify(torrent.name, dl_limit, dl_reason, state.tid)
+                    self.logger.warning(f"[{row.name[:16]}] 📥 下载限速: {dl_limit}K")
+                    self.notifier.dl_limit_notify(row.name, dl_limit, dl_reason, state.tid)
             elif state.last_dl_limit > 0:
-                self.logger.info(f"[{torrent.name[:16]}] 📥 解除限速")
+                self.logger.info(f"[{row.name[:16]}] 📥 解除限速")
             
             dl_actions.setdefault(dl_limit * 1024 if dl_limit > 0 else -1, []).append(h)
             self.modified_dl.add(h)
@@ -657,74 +759,70 @@ class Controller:
         self.logger.info(f"   数据库: ✅ {C.DB_PATH}")
         self.logger.info("=" * 60)
         
-        self._connect()
-        
-        # 初始化订阅和删种模块
-        self._init_modules()
-        
-        self.notifier.startup(cfg, self.qb_version, self.u2_enabled)
-        
-        while self.running:
-            start = wall_time()
-            min_tl = 3600
+        try:
+            self._connect()
             
-            try:
-                self._check_config(start)
-
-                torrents = self.client.torrents_info(status_filter='active')
-                
-                up_actions: Dict[int, List[str]] = {}
-                dl_actions: Dict[int, List[str]] = {}
-                now = wall_time()
+            # 初始化订阅和删种模块
+            self._init_modules()
+            
+            self.notifier.startup(cfg, self.qb_version, self.u2_enabled)
+            
+            while self.running:
+                start = time.monotonic()
+                min_tl = 3600
                 
-                for t in torrents:
-                    if getattr(t, 'state', '') in self.ACTIVE:
+                try:
+                    self._check_config(wall_time())
+
+                    torrents = self.client.torrents_info(status_filter='active')
+                    
+                    up_actions: Dict[int, List[str]] = {}
+                    dl_actions: Dict[int, List[str]] = {}
+                    now = wall_time()
+                    # 先按状态过滤，字段每周期只提取一次，后续计算只读快照
+                    active_states = self.ACTIVE
+                    rows = [TRow.from_torrent(t) for t in torrents if t.get('state') in active_states]
+                    managed = [r for r in rows if self._should_manage(r)]
+                    props_map = self._fetch_props(managed, now)
+                    
+                    for r in managed:
                         try:
-                            tl = self._process(t, now, up_actions, dl_actions)
+                            tl = self._process(r, now, props_map.get(r.hash), up_actions, dl_actions)
                             min_tl = min(min_tl, tl)
                         except Exception as e:
-                            self.logger.debug(f"处理种子异常: {e}")
-                
-                for limit, hashes in up_actions.items():
-                    try:
-                        self.client.torrents_set_upload_limit(limit, hashes)
-                    except Exception as e:
-                        self.logger.debug(f"设置上传限速失败: {e}")
-                
-                for limit, hashes in dl_actions.items():
+                            self.logger.debug("处理种子异常: %s", e)
+                    
+                    self._apply_limits(up_actions, dl_actions)
+                    
+                    active = {r.hash for r in rows}
+                    for h in self.states.keys() - active:
+                        del self.states[h]
+                    
+                except APIConnectionError:
+                    self.logger.warning("⚠️ 连接断开，重新连接...")
+                    self._wake.wait(5)
                     try:
-                        self.client.torrents_set_download_limit(limit, hashes)
-                    except Exception as e:
-                        self.logger.debug(f"设置下载限速失败: {e}")
+                        self._connect()
+                    except:
+                        pass
+                except Exception as e:
+                    self.logger.error(f"❌ 异常: {e}")
                 
-                active = {t.hash for t in torrents if getattr(t, 'state', '') in self.ACTIVE}
-                for h in list(self.states):
-                    if h not in active:
-                        del self.states[h]
+                elapsed = time.monotonic() - start
+                if min_tl <= 5:
+                    sleep = 0.15
+                elif min_tl <= 15:
+                    sleep = 0.25
+                elif min_tl <= 30:
+                    sleep = 0.4
+                elif min_tl <= 90:
+                    sleep = 0.8
+                else:
+                    sleep = 1.5
                 
-            except APIConnectionError:
-                self.logger.warning("⚠️ 连接断开，重新连接...")
-                time.sleep(5)
-                try:
-                    self._connect()
-                except:
-                    pass
-            except Exception as e:
-                self.logger.error(f"❌ 异常: {e}")
-            
-            elapsed = wall_time() - start
-            if min_tl <= 5:
-                sleep = 0.15
-            elif min_tl <= 15:
-                sleep = 0.25
-            elif min_tl <= 30:
-                sleep = 0.4
-            elif min_tl <= 90:
-                sleep = 0.8
-            else:
-                sleep = 1.5
-            
-            time.sleep(max(0.1, sleep - elapsed))
+                self._wake.wait(max(0.1, sleep - elapsed))
+        finally:
+            self._shutdown()
 
 
 def main():
@@ -13,13 +13,52 @@
 """
 
 import os
-import json
+import re
 import time
-import shutil
+import heapq
 import threading
-from typing import Optional, Dict, Tuple, Any
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional, Dict, Tuple, Any, List
 
-from .utils import C, wall_time, get_logger, fmt_size, fmt_speed, fmt_duration
+from .utils import (
+    C, wall_time, get_logger,
+    json_loads, json_dumps, JSONDecodeError, atomic_write
+)
+
+
+def _torrent_meta(t: dict) -> Tuple[str, float, float, int, int, int]:
+    """删除记录所需字段：(名称, 分享率, 做种时长, 大小, 已上传, 已下载)
+
+    删种模块以 SIMPLE_RESPONSES 拉取种子列表，种子为普通 dict，一律按键取值。
+    """
+    g = t.get
+    return (
+        g('name') or 'Unknown', g('ratio') or 0, g('seeding_time') or 0, g('total_size') or 0,
+        g('uploaded') or 0, g('completed') or g('downloaded') or 0,
+    )
+
+
+# qBittorrent 状态只有十几种，小写结果按原字符串缓存，避免每个种子每轮重复 lower()
+_STATE_LOWER: Dict[str, str] = {}
+
+
+def _state_lc(t: dict) -> str:
+    s = t.get('state') or ''
+    lc = _STATE_LOWER.get(s)
+    if lc is None:
+        lc = _STATE_LOWER[s] = s.lower()
+    return lc
+
+
+# 空间规则原因文本模板：[方向 0 上传 / 1 下载][优先级]，参数 (剩余G, 阈值G, 速度KiB/s, 阈值KiB/s)
+_REASON_TEMPLATES = (
+    ("[上传-紧急] 剩余{0:.1f}G<{1}G, 上传{2:.0f}KiB/s<{3}",
+     "[上传] 剩余{0:.1f}G<{1}G, 上传{2:.0f}KiB/s<{3}",
+     "[上传] 剩余{0:.1f}G<{1}G, 已完成, 上传{2:.0f}KiB/s<{3}"),
+    ("[下载-紧急] 剩余{0:.1f}G<{1}G, 下载{2:.0f}KiB/s<{3}",
+     "[下载] 剩余{0:.1f}G<{1}G, 下载{2:.0f}KiB/s<{3}",
+     "[下载] 剩余{0:.1f}G<{1}G, 下载{2:.0f}KiB/s<{3}"),
+)
 
 
 class CleanupModule:
@@ -41,18 +80,40 @@ class CleanupModule:
         self.db = db
         self.notifier = notifier
         self.running = False
-        self._stop = threading.Event()
+        self._stopped = False  # 停止标志，读写经 _cond 通知
+        self._wake_requested = False  # wake() 请求立即检查，读写经 _cond
         self._thread: Optional[threading.Thread] = None
         self._lock = threading.Lock()
+        # 待删除到期 / 停止时唤醒工作线程
+        self._cond = threading.Condition(self._lock)
         
-        # 任务文件路径
-        self.task_file = os.path.join(os.path.dirname(config._mtime and "" or C.CLEANUP_TASK_FILE), C.CLEANUP_TASK_FILE)
+        # 任务文件路径（与数据库一样相对工作目录）
+        self.task_file = C.CLEANUP_TASK_FILE
+        
+        # 任务文件解析缓存：((mtime_ns, size), tasks)，文件未变化时不重复读取解析
+        self._task_file_cache: Optional[Tuple[Tuple[int, int], list]] = None
         
         # 保护列表 - 不会被自动删除的种子hash
         self._protected_hashes = set()
         
-        # 待删除队列（等待汇报后删除）
+        # 待删除队列（等待汇报后删除）：hash -> info，另以 (删除时间, hash) 小顶堆排序到期顺序
         self._pending_delete: Dict[str, dict] = {}
+        self._pending_heap: List[Tuple[float, str]] = []
+        
+        # 剩余空间 / 保存路径缓存：(值, 时间戳)
+        self._free_space_cache: Tuple[Optional[float], float] = (None, 0.0)
+        self._save_path_cache: Tuple[str, float] = ("", 0.0)
+        # sync/maindata 增量同步：上次的 rid 与已知的 free_space_on_disk（增量未变化时不返回该字段）
+        self._maindata_rid = 0
+        self._maindata_free: Optional[int] = None
+        # 删种线程与 TG 线程（get_status）都会取剩余空间，串行化缓存与增量同步状态
+        self._space_lock = threading.Lock()
+        # 空间规则缓存：(config 对象, 规则表)，见 _space_rules
+        self._rules_cache: Optional[Tuple[Any, Tuple[tuple, tuple]]] = None
+
+        # 后台 I/O 线程池（start 时创建）：强制汇报 / 分组删除与扫描、等待重叠
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        self._reannounce_futures: List[Future] = []
 
         # 自动删种：每删 1 个后等待一会儿，再重新检测空间
         self._recheck_wait_seconds = 30
@@ -60,6 +121,11 @@ class CleanupModule:
         # qBittorrent 状态集合（统一为小写）
         self._upload_states = {'seeding', 'stalledup', 'uploading', 'forcedup'}
         self._download_states = {'downloading', 'stalleddl', 'forceddl', 'metadl'}
+        # 等待/排队/暂停（qB 5 起为 stopped）中的任务不自动删除
+        self._waiting_states = frozenset({
+            'queueddl', 'queuedup', 'queuedforchecking',
+            'pauseddl', 'pausedup', 'stoppeddl', 'stoppedup',
+        })
     
     def start(self):
         """启动删种模块"""
@@ -67,7 +133,8 @@ class CleanupModule:
             return
         
         self.running = True
-        self._stop.clear()
+        self._stopped = False
+        self._io_pool = ThreadPoolExecutor(max_workers=C.CLEANUP_IO_WORKERS, thread_name_prefix="CleanupIO")
         self._thread = threading.Thread(target=self._worker, daemon=True, name="Cleanup")
         self._thread.start()
         get_logger().info("🗑️ 删种模块已启动")
@@ -75,14 +142,52 @@ class CleanupModule:
     def stop(self):
         """停止删种模块"""
         self.running = False
-        self._stop.set()
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
         if self._thread:
             self._thread.join(timeout=5)
+        if self._io_pool:
+            self._io_pool.shutdown(wait=False, cancel_futures=True)
+            self._io_pool = None
         get_logger().info("🗑️ 删种模块已停止")
 
+    def wake(self):
+        """空间可能下降时（如新添加种子）请求立即检查，不必等到下个 interval"""
+        with self._cond:
+            self._wake_requested = True
+            self._cond.notify()
+
+
+    def _get_free_space_gb(self, ttl: float = C.CLEANUP_SPACE_TTL) -> Optional[float]:
+        """获取剩余空间（GB），ttl 秒内复用上次结果；获取失败返回 None（同样缓存）"""
+        with self._space_lock:
+            value, ts = self._free_space_cache
+            now = wall_time()
+            if ts > 0 and now - ts < ttl:
+                return value
+            value = self._fetch_free_space_gb()
+            self._free_space_cache = (value, now)
+            return value
+    
+    def _invalidate_free_space(self):
+        """删除种子后空间已变化，下次检测重新获取"""
+        with self._space_lock:
+            self._free_space_cache = (None, 0.0)
+    
+    def _get_save_path(self) -> str:
+        """qB 默认保存路径（偏好设置很少变化，按 CLEANUP_PREFS_TTL 缓存）"""
+        path, ts = self._save_path_cache
+        now = wall_time()
+        if path and now - ts < C.CLEANUP_PREFS_TTL:
+            return path
+        prefs = self.client.app_preferences()
+        path = prefs.get('save_path', '/downloads')
+        self._save_path_cache = (path, now)
+        return path
 
-    def _get_free_space_gb(self) -> float:
-        """获取 qBittorrent 默认保存路径所在磁盘的剩余空间（GB）。
+    def _fetch_free_space_gb(self) -> Optional[float]:
+        """获取 qBittorrent 默认保存路径所在磁盘的剩余空间（GB），调用方需持有 _space_lock。
 
         重要：如果脚本运行在另一台机器上（qB 在远端），不能用本机磁盘空间判断，
         否则会出现“空间误判 → 乱删种”。
@@ -94,17 +199,23 @@ class CleanupModule:
         try:
             md = None
             fn = getattr(self.client, 'sync_maindata', None)
-            if callable(fn):
-                # qbittorrentapi 通常提供该方法
-                md = fn(rid=0)
-            else:
+            if not callable(fn):
                 sync = getattr(self.client, 'sync', None)
-                if sync is not None:
-                    fn2 = getattr(sync, 'maindata', None)
-                    if callable(fn2):
-                        md = fn2(rid=0)
+                fn = getattr(sync, 'maindata', None) if sync is not None else None
+            if callable(fn):
+                # 带上次 rid 只取增量；rid=0 会返回全部种子，种子多时非常重
+                md = fn(rid=self._maindata_rid)
 
             free_bytes = self._extract_free_space_on_disk(md) if md is not None else None
+            if md is not None:
+                get = md.get if isinstance(md, dict) else (lambda k, d=None: getattr(md, k, d))
+                if free_bytes is None and not get('full_update'):
+                    free_bytes = self._maindata_free  # 增量中未出现即未变化
+                else:
+                    self._maindata_free = free_bytes
+                rid = get('rid')
+                if isinstance(rid, int):
+                    self._maindata_rid = rid
             if isinstance(free_bytes, (int, float)) and free_bytes >= 0:
                 return float(free_bytes) / (1024 ** 3)
         except Exception as e:
@@ -112,14 +223,20 @@ class CleanupModule:
 
         # 2) 回退：本机磁盘检测（仅当脚本与 qB 同机/同挂载点时才准确）
         try:
-            prefs = self.client.app_preferences()
-            save_path = prefs.get('save_path', '/downloads')
+            save_path = self._get_save_path()
+            if hasattr(os, 'statvfs'):
+                # 只需要可用空间，一次 statvfs 即可；路径不存在时回退根目录
+                try:
+                    st = os.statvfs(save_path)
+                except OSError:
+                    st = os.statvfs('/')
+                return st.f_bavail * st.f_frsize / (1024 ** 3)
+            import shutil  # 仅无 statvfs 的平台（Windows）需要
             check_path = save_path if os.path.exists(save_path) else '/'
-            stat = shutil.disk_usage(check_path)
-            return stat.free / (1024 ** 3)
+            return shutil.disk_usage(check_path).free / (1024 ** 3)
         except Exception as e:
             get_logger().debug(f"获取剩余空间失败: {e}")
-            return float('inf')  # 返回无限大，避免误删
+            return None  # 获取失败：本轮跳过空间规则，避免误删
 
     @staticmethod
     def _extract_free_space_on_disk(maindata: Any) -> Optional[int]:
@@ -159,12 +276,6 @@ class CleanupModule:
             v = getattr(ss, 'freeSpaceOnDisk', None)
         return int(v) if isinstance(v, (int, float)) else None
 
-    @staticmethod
-    def _is_waiting_state(state: str) -> bool:
-        """等待/排队/暂停中的任务不自动删除。"""
-        s = (state or "").lower()
-        return ('queued' in s) or ('paused' in s)
-
     def _space_target_gb(self) -> float:
         """空间恢复目标：高于所有规则的空间阈值即可避免继续触发。"""
         return float(max(
@@ -173,76 +284,84 @@ class CleanupModule:
             self.config.cleanup_space_rule3_gb,
         ))
 
-    def _check_upload_space_rules(self, torrent: Any, free_space_gb: float) -> Tuple[bool, str, int, float]:
-        """检查上传(做种)规则。返回 (命中, 原因, 优先级, 当前速度KiB/s)。"""
-        state = (getattr(torrent, 'state', '') or '').lower()
-        if self._is_waiting_state(state):
-            return False, "", 99, 0.0
-
-        # 仅对做种/上传状态生效
-        is_seeding = state in self._upload_states
-        if not is_seeding:
-            return False, "", 99, 0.0
-
-        up_speed = getattr(torrent, 'upspeed', 0) or 0
-        up_kib = up_speed / 1024
+    def _space_rules(self) -> Tuple[tuple, tuple]:
+        """按优先级排好的 (上传规则, 下载规则)，阈值预先换算为 bytes/s。
 
-        progress = getattr(torrent, 'progress', 0) or 0
+        每条规则：(优先级, 空间阈值G, 速度阈值bytes/s, 速度阈值KiB/s, 需已完成)。
+        配置热重载会替换 config 对象，按对象身份失效重建。
+        """
+        cached = self._rules_cache
+        cfg = self.config
+        if cached is not None and cached[0] is cfg:
+            return cached[1]
+        r1_gb, r2_gb, r3_gb = cfg.cleanup_space_rule1_gb, cfg.cleanup_space_rule2_gb, cfg.cleanup_space_rule3_gb
+        r1_up, r2_up, r3_up = (cfg.cleanup_space_rule1_upload_kib, cfg.cleanup_space_rule2_upload_kib,
+                               cfg.cleanup_space_rule3_upload_kib)
+        r1_dl, r2_dl, r3_dl = (cfg.cleanup_space_rule1_download_kib, cfg.cleanup_space_rule2_download_kib,
+                               cfg.cleanup_space_rule3_download_kib)
+        # 规则3 (紧急) > 规则1 > 规则2；上传规则2 仅对已完成种子生效
+        rules = (
+            ((0, r3_gb, r3_up * 1024, r3_up, False),
+             (1, r1_gb, r1_up * 1024, r1_up, False),
+             (2, r2_gb, r2_up * 1024, r2_up, True)),
+            ((0, r3_gb, r3_dl * 1024, r3_dl, False),
+             (1, r1_gb, r1_dl * 1024, r1_dl, False),
+             (2, r2_gb, r2_dl * 1024, r2_dl, False)),
+        )
+        self._rules_cache = (cfg, rules)
+        return rules
+
+    def _match_space_rule(self, torrent: dict, direction: int, free_space_gb: float,
+                          rules: tuple) -> Tuple[Optional[tuple], int]:
+        """按 rules 顺序匹配（direction: 0 上传 / 1 下载），返回 (命中的规则或 None, 当前速度 bytes/s)。
+
+        只做数值比较，原因文本由 _format_reason 在需要时生成。
+        """
+        progress = torrent.get('progress') or 0
+        if direction:
+            # 下载规则只对未完成的种子生效
+            if progress >= 1.0:
+                return None, 0
+            speed = torrent.get('dlspeed') or 0
+        else:
+            speed = torrent.get('upspeed') or 0
         is_completed = progress >= 1.0
+        for rule in rules:
+            if free_space_gb < rule[1] and speed < rule[2] and (is_completed or not rule[4]):
+                return rule, speed
+        return None, speed
 
-        # 规则3 (紧急) > 规则1 > 规则2
-        r3_gb = self.config.cleanup_space_rule3_gb
-        r3_up = self.config.cleanup_space_rule3_upload_kib
-        if free_space_gb < r3_gb and up_kib < r3_up:
-            return True, f"[上传-紧急] 剩余{free_space_gb:.1f}G<{r3_gb}G, 上传{up_kib:.0f}KiB/s<{r3_up}", 0, up_kib
-
-        r1_gb = self.config.cleanup_space_rule1_gb
-        r1_up = self.config.cleanup_space_rule1_upload_kib
-        if free_space_gb < r1_gb and up_kib < r1_up:
-            return True, f"[上传] 剩余{free_space_gb:.1f}G<{r1_gb}G, 上传{up_kib:.0f}KiB/s<{r1_up}", 1, up_kib
-
-        r2_gb = self.config.cleanup_space_rule2_gb
-        r2_up = self.config.cleanup_space_rule2_upload_kib
-        if free_space_gb < r2_gb and is_completed and up_kib < r2_up:
-            return True, f"[上传] 剩余{free_space_gb:.1f}G<{r2_gb}G, 已完成, 上传{up_kib:.0f}KiB/s<{r2_up}", 2, up_kib
+    @staticmethod
+    def _format_reason(direction: int, rule: tuple, free_space_gb: float, speed: int) -> str:
+        return _REASON_TEMPLATES[direction][rule[0]].format(free_space_gb, rule[1], speed / 1024, rule[3])
 
-        return False, "", 99, up_kib
+    def _check_upload_space_rules(self, torrent: dict, free_space_gb: float,
+                                  rules: Optional[tuple] = None) -> Tuple[bool, str, int, float]:
+        """检查上传(做种)规则。返回 (命中, 原因, 优先级, 当前速度KiB/s)。
 
-    def _check_download_space_rules(self, torrent: Any, free_space_gb: float) -> Tuple[bool, str, int, float]:
-        """检查下载规则。返回 (命中, 原因, 优先级, 当前速度KiB/s)。"""
-        state = (getattr(torrent, 'state', '') or '').lower()
-        if self._is_waiting_state(state):
+        rules 为调用方按剩余空间预筛过的规则表，缺省用全部上传规则。
+        """
+        # 仅对做种/上传状态生效（queued/paused 等待状态不在集合内）
+        if _state_lc(torrent) not in self._upload_states:
             return False, "", 99, 0.0
-
-        # 仅对下载中状态生效
-        is_downloading = state in self._download_states
-        if not is_downloading:
+        rule, speed = self._match_space_rule(torrent, 0, free_space_gb,
+                                             self._space_rules()[0] if rules is None else rules)
+        if rule is None:
             return False, "", 99, 0.0
+        return True, self._format_reason(0, rule, free_space_gb, speed), rule[0], speed / 1024
 
-        progress = getattr(torrent, 'progress', 0) or 0
-        if progress >= 1.0:
+    def _check_download_space_rules(self, torrent: dict, free_space_gb: float,
+                                    rules: Optional[tuple] = None) -> Tuple[bool, str, int, float]:
+        """检查下载规则。返回 (命中, 原因, 优先级, 当前速度KiB/s)。rules 同上传规则。"""
+        # 仅对下载中状态生效（queued/paused 等待状态不在集合内）
+        if _state_lc(torrent) not in self._download_states:
             return False, "", 99, 0.0
+        rule, speed = self._match_space_rule(torrent, 1, free_space_gb,
+                                             self._space_rules()[1] if rules is None else rules)
+        if rule is None:
+            return False, "", 99, 0.0
+        return True, self._format_reason(1, rule, free_space_gb, speed), rule[0], speed / 1024
 
-        dl_speed = getattr(torrent, 'dlspeed', 0) or 0
-        dl_kib = dl_speed / 1024
-
-        r3_gb = self.config.cleanup_space_rule3_gb
-        r3_dl = self.config.cleanup_space_rule3_download_kib
-        if free_space_gb < r3_gb and dl_kib < r3_dl:
-            return True, f"[下载-紧急] 剩余{free_space_gb:.1f}G<{r3_gb}G, 下载{dl_kib:.0f}KiB/s<{r3_dl}", 0, dl_kib
-
-        r1_gb = self.config.cleanup_space_rule1_gb
-        r1_dl = self.config.cleanup_space_rule1_download_kib
-        if free_space_gb < r1_gb and dl_kib < r1_dl:
-            return True, f"[下载] 剩余{free_space_gb:.1f}G<{r1_gb}G, 下载{dl_kib:.0f}KiB/s<{r1_dl}", 1, dl_kib
-
-        r2_gb = self.config.cleanup_space_rule2_gb
-        r2_dl = self.config.cleanup_space_rule2_download_kib
-        if free_space_gb < r2_gb and dl_kib < r2_dl:
-            return True, f"[下载] 剩余{free_space_gb:.1f}G<{r2_gb}G, 下载{dl_kib:.0f}KiB/s<{r2_dl}", 2, dl_kib
-
-        return False, "", 99, dl_kib
-    
     def _do_reannounce(self, torrent_hash: str, name: str) -> bool:
         """执行强制汇报"""
         try:
@@ -253,64 +372,197 @@ class CleanupModule:
             get_logger().debug(f"强制汇报失败: {e}")
             return False
     
+    def _submit_io(self, fn, *args) -> Optional[Future]:
+        """提交到后台 I/O 线程池；未启动或已关闭时在当前线程同步执行并返回 None"""
+        pool = self._io_pool
+        if pool is not None:
+            try:
+                return pool.submit(fn, *args)
+            except RuntimeError:
+                pass
+        fn(*args)
+        return None
+
+    def _reannounce_async(self, fn, *args):
+        """后台强制汇报，记下 Future 供到期删除前确认已完成"""
+        fut = self._submit_io(fn, *args)
+        if fut is not None:
+            with self._lock:
+                self._reannounce_futures = [f for f in self._reannounce_futures if not f.done()]
+                self._reannounce_futures.append(fut)
+
+    def _await_reannounce(self, timeout: float = 10.0):
+        """删除前等待仍在进行的强制汇报，避免汇报未发出就删种"""
+        with self._lock:
+            futures, self._reannounce_futures = self._reannounce_futures, []
+        deadline = time.monotonic() + timeout
+        for fut in futures:
+            try:
+                fut.result(timeout=max(0.0, deadline - time.monotonic()))
+            except Exception:
+                pass
+
+    def _flush_reannounce(self, batch: List[Tuple[str, str]]):
+        """后台一次请求强制汇报 batch 中的全部种子 [(hash, name), ...]"""
+        if batch:
+            self._reannounce_async(self._reannounce_batch_now, list(batch))
+
+    def _reannounce_batch_now(self, batch: List[Tuple[str, str]]):
+        if len(batch) == 1:
+            self._do_reannounce(*batch[0])
+            return
+        try:
+            self.client.torrents_reannounce(torrent_hashes=[h for h, _ in batch])
+            get_logger().info(f"🔄 删前强制汇报 {len(batch)} 个种子")
+        except Exception as e:
+            get_logger().debug(f"强制汇报失败: {e}")
+    
+    def _wait(self, timeout: float) -> bool:
+        """等待 timeout 秒，收到停止信号时提前返回 True"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not self._stopped:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return self._stopped
+    
+    @staticmethod
+    def _lower_thread_priority():
+        """降低当前线程调度优先级，避免与限速主循环/TG 线程争抢 CPU"""
+        if not hasattr(os, 'setpriority'):
+            return
+        try:
+            # Linux 上 nice 值是线程级的，按 native id 只影响本线程
+            tid = threading.get_native_id()
+            os.setpriority(os.PRIO_PROCESS, tid, os.getpriority(os.PRIO_PROCESS, tid) + C.CLEANUP_NICE)
+        except OSError as e:
+            get_logger().debug("降低删种线程优先级失败: %s", e)
+
     def _worker(self):
         """后台工作线程"""
         logger = get_logger()
+        self._lower_thread_priority()
         interval = self.config.cleanup_interval
+        next_run = 0.0
         
-        while not self._stop.is_set():
+        while not self._stopped:
             try:
                 # 1. 处理待删除队列（等待汇报后删除）
                 self._process_pending_delete()
                 
-                # 2. 处理任务文件（手动删除指令）
-                self._process_task_file()
-                
-                # 3. 自动检查和删除
-                self._auto_cleanup()
+                if wall_time() >= next_run:
+                    # 剩余空间高于所有规则阈值时，任何种子都不会命中，无需拉取种子列表
+                    target_gb = self._space_target_gb()
+                    free_gb = self._get_free_space_gb() if self.config.cleanup_enabled else None
+                    need_cleanup = free_gb is not None and free_gb < target_gb
+                    
+                    # 有任务文件时拉取完整列表，任务文件与自动清理共用这份快照；
+                    # 否则由 _auto_cleanup 只拉取服务端过滤后的候选种子
+                    torrents = None
+                    if os.path.exists(self.task_file):
+                        torrents = self.client.torrents_info(SIMPLE_RESPONSES=True)
+                    
+                    # 2. 处理任务文件（手动删除指令）
+                    if self._process_task_file(torrents):
+                        torrents = None  # 已有种子被删除，快照作废
+                    
+                    # 3. 自动检查和删除
+                    if need_cleanup:
+                        self._auto_cleanup(torrents)
+                    # 接近阈值时缩短下次检查间隔，尽早发现空间告急
+                    if free_gb is not None and free_gb < target_gb * C.CLEANUP_NEAR_RATIO:
+                        next_run = wall_time() + min(interval, self._recheck_wait_seconds)
+                    else:
+                        next_run = wall_time() + interval
                 
             except Exception as e:
                 logger.error(f"删种模块异常: {e}")
+                next_run = wall_time() + interval
             
-            # 等待下一次循环
-            self._stop.wait(interval)
+            # 睡到下一次检查或最早的待删除到期，新的更早到期项 / wake() / 停止会提前唤醒
+            with self._cond:
+                if self._stopped:
+                    break
+                if not self._wake_requested:
+                    timeout = next_run - wall_time()
+                    if self._pending_heap:
+                        timeout = min(timeout, self._pending_heap[0][0] - wall_time())
+                    if timeout > 0:
+                        self._cond.wait(timeout)
+                if self._wake_requested:
+                    self._wake_requested = False
+                    next_run = 0.0
+                    self._invalidate_free_space()
     
     def _process_pending_delete(self):
         """处理待删除队列"""
         logger = get_logger()
         now = wall_time()
         
+        # 无到期项时不加锁直接返回：heappush 在 C 层整体完成，读堆顶是原子的
+        heap = self._pending_heap
+        if not heap or heap[0][0] > now:
+            return
+        
         with self._lock:
             to_delete = []
-            for h, info in list(self._pending_delete.items()):
-                if now >= info['delete_time']:
-                    to_delete.append((h, info))
+            while heap and heap[0][0] <= now:
+                _, h = heapq.heappop(heap)
+                info = self._pending_delete.get(h)
+                # 同一 hash 被重新安排时旧的堆条目作废
+                if info is not None and info['delete_time'] <= now:
                     del self._pending_delete[h]
-            
+                    to_delete.append((h, info))
+        
+        if not to_delete:
+            return
+        self._await_reannounce()
+        
+        # 按 delete_files 分组，每组一次 API 调用，多组时并行下发
+        groups: Dict[bool, List[Tuple[str, dict]]] = {}
         for h, info in to_delete:
+            groups.setdefault(bool(info['delete_files']), []).append((h, info))
+        parallel = len(groups) > 1
+        futures: List[Future] = []
+        for delete_files, items in groups.items():
             try:
-                self._execute_delete(
-                    h, info['name'], info['delete_files'], 
-                    info['reason'], info['ratio'], info['seeding_time'],
-                    info.get('size', 0), info.get('uploaded', 0), info.get('downloaded', 0)
-                )
+                if parallel:
+                    fut = self._submit_io(self._execute_delete_batch, items, delete_files)
+                    if fut is not None:
+                        futures.append(fut)
+                else:
+                    self._execute_delete_batch(items, delete_files)
+            except Exception as e:
+                logger.error(f"执行删除失败: {e}")
+        for fut in futures:
+            try:
+                fut.result()
             except Exception as e:
                 logger.error(f"执行删除失败: {e}")
     
     def _schedule_delete(self, torrent_hash: str, name: str, delete_files: bool, 
                          reason: str, ratio: float, seeding_time: float,
-                         size: int = 0, uploaded: int = 0, downloaded: int = 0):
-        """安排删除（先汇报，等待后删除）"""
+                         size: int = 0, uploaded: int = 0, downloaded: int = 0,
+                         reannounce_batch: Optional[List[Tuple[str, str]]] = None):
+        """安排删除（先汇报，等待后删除）
+
+        传入 reannounce_batch 时只收集待汇报的种子，由调用方统一 _flush_reannounce。
+        """
         logger = get_logger()
         
         # 执行强制汇报
         if self.config.cleanup_reannounce_before_delete:
-            self._do_reannounce(torrent_hash, name)
+            if reannounce_batch is None:
+                self._reannounce_async(self._do_reannounce, torrent_hash, name)
+            else:
+                reannounce_batch.append((torrent_hash, name))
             wait_time = self.config.cleanup_reannounce_wait
             delete_time = wall_time() + wait_time
             logger.info(f"[{name[:20]}] ⏳ 等待{wait_time}秒后删除")
             
-            with self._lock:
+            with self._cond:
                 self._pending_delete[torrent_hash] = {
                     'name': name,
                     'delete_files': delete_files,
@@ -322,6 +574,10 @@ class CleanupModule:
                     'downloaded': downloaded,
                     'delete_time': delete_time
                 }
+                heapq.heappush(self._pending_heap, (delete_time, torrent_hash))
+                # 只有成为最早到期项时才需要唤醒工作线程重算等待时间
+                if self._pending_heap[0][1] == torrent_hash:
+                    self._cond.notify()
         else:
             # 不需要汇报，直接删除
             self._execute_delete(torrent_hash, name, delete_files, reason, ratio, seeding_time,
@@ -335,46 +591,116 @@ class CleanupModule:
         
         try:
             self.client.torrents_delete(delete_files=delete_files, torrent_hashes=torrent_hash)
-            
-            # 记录到数据库
-            self.db.add_cleanup_history(torrent_hash, name, reason, ratio, seeding_time)
-            
-            # TG通知 - 详细信息
-            if self.notifier:
-                self.notifier.cleanup_notify_detailed(
-                    name=name, 
-                    reason=reason, 
-                    ratio=ratio, 
-                    seeding_time=seeding_time,
-                    size=size,
-                    uploaded=uploaded,
-                    downloaded=downloaded,
-                    delete_files=delete_files
-                )
-            
-            logger.info(f"🗑️ 删除种子: {name[:40]} ({reason})")
+            self._invalidate_free_space()
+            self._record_delete(torrent_hash, name, delete_files, reason, ratio, seeding_time,
+                                size, uploaded, downloaded)
             return True
         
         except Exception as e:
             logger.error(f"删除种子失败 {name[:30]}: {e}")
             return False
     
-    def _process_task_file(self):
-        """处理任务文件"""
+    def _execute_delete_batch(self, items: List[Tuple[str, dict]], delete_files: bool) -> bool:
+        """一次 API 调用删除多个种子（items 为待删除队列条目），之后统一写历史、合并通知"""
+        if len(items) == 1:
+            h, info = items[0]
+            return self._execute_delete(
+                h, info['name'], delete_files, info['reason'], info['ratio'], info['seeding_time'],
+                info.get('size', 0), info.get('uploaded', 0), info.get('downloaded', 0)
+            )
+        
         logger = get_logger()
+        try:
+            self.client.torrents_delete(delete_files=delete_files, torrent_hashes=[h for h, _ in items])
+        except Exception as e:
+            # 批量请求失败时逐个重试，单个失败不影响其余种子
+            logger.warning(f"批量删除种子失败 ({len(items)}个)，逐个重试: {e}")
+            ok = False
+            for h, info in items:
+                if self._stopped:
+                    break
+                ok = self._execute_delete(
+                    h, info['name'], delete_files, info['reason'], info['ratio'], info['seeding_time'],
+                    info.get('size', 0), info.get('uploaded', 0), info.get('downloaded', 0)
+                ) or ok
+            return ok
         
-        if not os.path.exists(self.task_file):
-            return
+        self._invalidate_free_space()
+        try:
+            self.db.add_cleanup_history_many([
+                (h, info['name'], info['reason'], info['ratio'], info['seeding_time']) for h, info in items
+            ])
+        except Exception as e:
+            logger.error(f"记录删种历史失败 ({len(items)}个): {e}")
+        if self.notifier:
+            try:
+                self.notifier.cleanup_notify_batch([{
+                    'name': info['name'], 'reason': info['reason'], 'ratio': info['ratio'],
+                    'seeding_time': info['seeding_time'], 'size': info.get('size', 0),
+                    'uploaded': info.get('uploaded', 0), 'downloaded': info.get('downloaded', 0),
+                    'delete_files': delete_files,
+                } for _, info in items])
+            except Exception as e:
+                logger.error(f"删种通知失败: {e}")
+        for _, info in items:
+            logger.info(f"🗑️ 删除种子: {info['name'][:40]} ({info['reason']})")
+        return True
+    
+    def _record_delete(self, torrent_hash: str, name: str, delete_files: bool,
+                       reason: str, ratio: float, seeding_time: float,
+                       size: int = 0, uploaded: int = 0, downloaded: int = 0):
+        """删除成功后：写历史、发通知、记日志"""
+        # 记录到数据库
+        self.db.add_cleanup_history(torrent_hash, name, reason, ratio, seeding_time)
+        
+        # TG通知 - 详细信息
+        if self.notifier:
+            self.notifier.cleanup_notify_detailed(
+                name=name, 
+                reason=reason, 
+                ratio=ratio, 
+                seeding_time=seeding_time,
+                size=size,
+                uploaded=uploaded,
+                downloaded=downloaded,
+                delete_files=delete_files
+            )
         
+        get_logger().info(f"🗑️ 删除种子: {name[:40]} ({reason})")
+    
+    def _process_task_file(self, torrents: Optional[List[Any]] = None) -> int:
+        """处理任务文件，返回删除的种子数（torrents 为本轮快照，None 时按需请求）"""
+        logger = get_logger()
+        
+        try:
+            st = os.stat(self.task_file)
+        except OSError:
+            self._task_file_cache = None
+            return 0
+        key = (st.st_mtime_ns, st.st_size)
+        
+        deleted_count = 0
         try:
-            with open(self.task_file, 'r', encoding='utf-8') as f:
-                tasks = json.load(f)
+            if self._task_file_cache and self._task_file_cache[0] == key:
+                tasks = self._task_file_cache[1]
+            else:
+                # 先占位缓存，格式错误时不会每轮重复解析告警
+                self._task_file_cache = (key, [])
+                with open(self.task_file, 'rb') as f:
+                    tasks = json_loads(f.read())
+                if isinstance(tasks, list):
+                    self._task_file_cache = (key, tasks)
             
             if not isinstance(tasks, list) or not tasks:
-                return
+                return 0
+            
+            if torrents is None:
+                torrents = self.client.torrents_info(SIMPLE_RESPONSES=True)
+            by_hash = {t['hash']: t for t in torrents}
             
             remaining_tasks = []
-            deleted_count = 0
+            name_tasks: List[Tuple[str, bool, str]] = []
+            reannounce_batch: List[Tuple[str, str]] = []
             
             for task in tasks:
                 if not isinstance(task, dict):
@@ -403,35 +729,51 @@ class CleanupModule:
                 if action == 'delete':
                     if torrent_hash:
                         # 按hash删除
-                        if self._delete_torrent_by_hash(torrent_hash, delete_files, reason):
+                        if self._delete_torrent_by_hash(torrent_hash, delete_files, reason, reannounce_batch, by_hash):
                             deleted_count += 1
                         else:
                             remaining_tasks.append(task)
                     elif name_pattern:
-                        # 按名称模式删除
-                        count = self._delete_torrent_by_name(name_pattern, delete_files, reason)
-                        deleted_count += count
+                        # 按名称模式删除：先收集，全部模式一次遍历匹配
+                        name_tasks.append((name_pattern, delete_files, reason))
             
-            # 更新任务文件
+            if name_tasks:
+                deleted_count += self._delete_torrents_by_names(name_tasks, reannounce_batch, torrents)
+            self._flush_reannounce(reannounce_batch)
+            
+            # 更新任务文件（剩余任务未变化时不重写）
             if remaining_tasks:
-                with open(self.task_file, 'w', encoding='utf-8') as f:
-                    json.dump(remaining_tasks, f, ensure_ascii=False, indent=2)
+                if remaining_tasks != tasks:
+                    atomic_write(self.task_file, json_dumps(remaining_tasks, indent=True))
+                    st = os.stat(self.task_file)
+                    self._task_file_cache = ((st.st_mtime_ns, st.st_size), remaining_tasks)
             else:
                 os.remove(self.task_file)
+                self._task_file_cache = None
             
             if deleted_count > 0:
                 logger.info(f"🗑️ 任务文件删除了 {deleted_count} 个种子")
         
-        except json.JSONDecodeError:
+        except JSONDecodeError:
             logger.warning(f"任务文件格式错误")
         except Exception as e:
             logger.error(f"任务文件处理失败: {e}")
+        return deleted_count
     
-    def _auto_cleanup(self):
+    def _fetch_candidates(self) -> List[Any]:
+        """只拉取可能命中空间规则的种子：由 qB 按 seeding / downloading 状态过滤，
+        已暂停、出错、移动中的种子不再随响应返回。"""
+        torrents = list(self.client.torrents_info(status_filter='seeding', SIMPLE_RESPONSES=True))
+        torrents.extend(self.client.torrents_info(status_filter='downloading', SIMPLE_RESPONSES=True))
+        return torrents
+
+    def _auto_cleanup(self, torrents: Optional[List[Any]] = None):
         """自动清理符合条件的种子（空间规则：上传 + 下载）。
 
         - queued/paused 的等待任务不会删除
-        - 每次只删除 1 个任务；删除后等待 30 秒再重新检测空间
+        - 仅移除种子时每次删除 1 个；删除文件时按空间缺口一次批量删除若干个（有上限）
+        - 删除后等待 30 秒再重新检测空间
+        - torrents 为本轮快照，仅首次检测使用，删除后重新获取
         """
         logger = get_logger()
 
@@ -440,108 +782,130 @@ class CleanupModule:
             return
 
         delete_files = self.config.cleanup_delete_files
-        tracker_keyword = self.config.cleanup_tracker_keyword
+        tracker_keyword = (self.config.cleanup_tracker_keyword or '').lower()
+        tracker_hits: Dict[str, bool] = {}
+        protected = self._protected_hashes
+        pending = self._pending_delete
         target_gb = self._space_target_gb()
+        upload_states = self._upload_states
+        download_states = self._download_states
+        match = self._match_space_rule
 
         try:
             loop_guard = 0
-            while not self._stop.is_set():
+            while not self._stopped:
                 free_gb = self._get_free_space_gb()
+                if free_gb is None:
+                    logger.warning("🗑️ 获取剩余空间失败，跳过本轮自动清理")
+                    break
                 if free_gb >= target_gb:
                     break
 
-                torrents = self.client.torrents_info()
-                best = None  # (priority, speed_kib, -release_bytes)
+                # 空间条件对本轮所有种子相同：先筛出生效的规则，种子循环只比较速度
+                up_rules, dl_rules = (tuple(r for r in rs if free_gb < r[1]) for rs in self._space_rules())
+
+                if torrents is None:
+                    torrents = self._fetch_candidates()
+                # ((优先级, 速度bytes/s, -可释放bytes), 种子, 方向, 规则)，原因文本只为选中的种子生成
+                hits: List[Tuple[tuple, dict, int, tuple]] = []
 
                 for t in torrents:
                     try:
-                        # 保护/待删队列跳过
-                        if t.hash in self._protected_hashes:
+                        # 保护/待删队列跳过（dict/set 成员判断无需加锁）
+                        h = t['hash']
+                        if h in protected or h in pending:
                             continue
-                        with self._lock:
-                            if t.hash in self._pending_delete:
-                                continue
 
-                        state = getattr(t, 'state', '') or ''
-                        if self._is_waiting_state(state):
+                        # 上传/下载状态互斥，只检查对应的一组规则（等待状态不在两组内）
+                        state = _state_lc(t)
+                        if state in upload_states:
+                            direction, rules = 0, up_rules
+                        elif state in download_states:
+                            direction, rules = 1, dl_rules
+                        else:
+                            continue
+                        if not rules:
                             continue
 
-                        # tracker 关键词过滤（可选）
+                        # tracker 关键词过滤（可选，同一 tracker 只判断一次）
                         if tracker_keyword:
-                            tracker = getattr(t, 'tracker', '') or ''
-                            if tracker_keyword.lower() not in tracker.lower():
+                            tracker = t.get('tracker') or ''
+                            ok = tracker_hits.get(tracker)
+                            if ok is None:
+                                ok = tracker_hits[tracker] = tracker_keyword in tracker.lower()
+                            if not ok:
                                 continue
 
-                        # 命中规则（上传 / 下载）
-                        hit_u, reason_u, pri_u, speed_u = self._check_upload_space_rules(t, free_gb)
-                        hit_d, reason_d, pri_d, speed_d = self._check_download_space_rules(t, free_gb)
-
-                        if not hit_u and not hit_d:
+                        rule, speed = match(t, direction, free_gb, rules)
+                        if rule is None:
                             continue
 
-                        # 选择更高优先级（数字越小越紧急）
-                        if hit_u and (not hit_d or pri_u <= pri_d):
-                            reason, pri, speed_kib = reason_u, pri_u, speed_u
-                        else:
-                            reason, pri, speed_kib = reason_d, pri_d, speed_d
-
-                        name = getattr(t, 'name', 'Unknown')
-                        ratio = getattr(t, 'ratio', 0) or 0
-                        seeding_time = getattr(t, 'seeding_time', 0) or 0
-                        size = getattr(t, 'total_size', 0) or 0
-                        uploaded = getattr(t, 'uploaded', 0) or 0
-                        downloaded = getattr(t, 'completed', 0) or getattr(t, 'downloaded', 0) or 0
-
                         release_bytes = (
-                            getattr(t, 'size_on_disk', 0) or
-                            getattr(t, 'total_size', 0) or
-                            getattr(t, 'downloaded', 0) or 0
+                            t.get('size_on_disk') or t.get('total_size') or t.get('downloaded') or 0
                         )
 
-                        key = (pri, speed_kib, -release_bytes)
-                        if best is None or key < best['key']:
-                            best = {
-                                'key': key,
-                                'hash': t.hash,
-                                'name': name,
-                                'reason': reason,
-                                'ratio': ratio,
-                                'seeding_time': seeding_time,
-                                'size': size,
-                                'uploaded': uploaded,
-                                'downloaded': downloaded,
-                            }
+                        hits.append(((rule[0], speed, -release_bytes), t, direction, rule))
 
                     except Exception as e:
                         logger.debug(f"检查种子失败: {e}")
 
-                if not best:
+                if not hits:
                     logger.warning(f"🗑️ 空间不足: {free_gb:.1f}G<{target_gb}G，但没有符合规则的可删任务（queued/paused 会被跳过）")
                     break
 
+                # 数字越小越紧急。删除文件时按缺口（留余量）一次选出多个，否则每次只删 1 个
+                hits.sort(key=lambda x: x[0])
+                chosen = hits[:1]
+                if delete_files:
+                    need = (target_gb - free_gb) * (1024 ** 3) * C.CLEANUP_BATCH_MARGIN
+                    freed = -hits[0][0][2]
+                    for hit in hits[1:C.CLEANUP_BATCH_MAX]:
+                        if freed >= need:
+                            break
+                        chosen.append(hit)
+                        freed += -hit[0][2]
+                release_gb = sum(-hit[0][2] for hit in chosen) / (1024 ** 3)
+
+                # 元信息、原因文本只对选中的种子生成
+                items: List[Tuple[str, dict]] = []
+                for key, t, direction, rule in chosen:
+                    name, ratio, seeding_time, size, uploaded, downloaded = _torrent_meta(t)
+                    items.append((t['hash'], {
+                        'name': name,
+                        'reason': self._format_reason(direction, rule, free_gb, key[1]),
+                        'ratio': ratio,
+                        'seeding_time': seeding_time,
+                        'size': size,
+                        'uploaded': uploaded,
+                        'downloaded': downloaded,
+                    }))
+
                 logger.info(
-                    f"🗑️ 空间不足: {free_gb:.1f}G<{target_gb}G，删除1个 → {best['name'][:40]} ({best['reason']})"
+                    f"🗑️ 空间不足: {free_gb:.1f}G<{target_gb}G，删除{len(items)}个 → "
+                    + "、".join(f"{info['name'][:40]} ({info['reason']})" for _, info in items)
                 )
 
                 # 自动删种：同步执行（便于删除后等待 30 秒再次检测）
                 if self.config.cleanup_reannounce_before_delete:
-                    self._do_reannounce(best['hash'], best['name'])
-                    if self._stop.wait(self.config.cleanup_reannounce_wait):
+                    self._reannounce_batch_now([(h, info['name']) for h, info in items])
+                    if self._wait(self.config.cleanup_reannounce_wait):
                         break
 
-                ok = self._execute_delete(
-                    best['hash'], best['name'], delete_files,
-                    best['reason'], best['ratio'], best['seeding_time'],
-                    best.get('size', 0), best.get('uploaded', 0), best.get('downloaded', 0)
-                )
-                if not ok:
+                if not self._execute_delete_batch(items, delete_files):
+                    break
+                torrents = None
+
+                # 删除文件时按释放量估算剩余空间，已达标则直接结束本轮，省去等待与重新查询；
+                # 估算偏高（如辅种共用文件）时，worker 在接近阈值时会以缩短的间隔复查
+                if delete_files and free_gb + release_gb >= target_gb:
+                    logger.info("🗑️ 预计释放后空间已达标，结束本轮自动清理")
                     break
 
                 logger.info(f"⏳ 等待{self._recheck_wait_seconds}秒后重新检测空间...")
-                if self._stop.wait(self._recheck_wait_seconds):
+                if self._wait(self._recheck_wait_seconds):
                     break
 
-                loop_guard += 1
+                loop_guard += len(items)
                 if loop_guard >= 50:
                     logger.warning("🗑️ 连续删除次数过多，停止本轮自动清理（防止异常循环）")
                     break
@@ -550,56 +914,72 @@ class CleanupModule:
             logger.error(f"自动清理失败: {e}")
 
 
-    def _delete_torrent_by_hash(self, torrent_hash: str, delete_files: bool, reason: str) -> bool:
-        """按hash删除种子"""
+    def _delete_torrent_by_hash(self, torrent_hash: str, delete_files: bool, reason: str,
+                                reannounce_batch: Optional[List[Tuple[str, str]]] = None,
+                                by_hash: Optional[Dict[str, Any]] = None) -> bool:
+        """按hash删除种子（by_hash 为本轮快照索引，None 时单独请求）"""
         logger = get_logger()
         
         try:
             # 获取种子信息
-            torrents = self.client.torrents_info(torrent_hashes=torrent_hash)
-            if not torrents:
+            if by_hash is not None:
+                t = by_hash.get(torrent_hash) or by_hash.get(torrent_hash.lower())
+            else:
+                torrents = self.client.torrents_info(torrent_hashes=torrent_hash, SIMPLE_RESPONSES=True)
+                t = torrents[0] if torrents else None
+            if t is None:
                 logger.warning(f"找不到种子: {torrent_hash[:16]}")
                 return False
             
-            t = torrents[0]
-            name = getattr(t, 'name', 'Unknown')
-            ratio = getattr(t, 'ratio', 0) or 0
-            seeding_time = getattr(t, 'seeding_time', 0) or 0
-            size = getattr(t, 'total_size', 0) or 0
-            uploaded = getattr(t, 'uploaded', 0) or 0
-            downloaded = getattr(t, 'completed', 0) or getattr(t, 'downloaded', 0) or 0
+            name, ratio, seeding_time, size, uploaded, downloaded = _torrent_meta(t)
             
             self._schedule_delete(torrent_hash, name, delete_files, reason, 
-                                 ratio, seeding_time, size, uploaded, downloaded)
+                                 ratio, seeding_time, size, uploaded, downloaded, reannounce_batch)
             return True
         
         except Exception as e:
             logger.error(f"按hash删除失败 {torrent_hash[:16]}: {e}")
             return False
     
-    def _delete_torrent_by_name(self, name_pattern: str, delete_files: bool, reason: str) -> int:
-        """按名称模式删除种子"""
+    def _delete_torrents_by_names(self, name_tasks: List[Tuple[str, bool, str]],
+                                  reannounce_batch: Optional[List[Tuple[str, str]]] = None,
+                                  torrents: Optional[List[Any]] = None) -> int:
+        """按多个名称模式删除种子 [(模式, 删除文件, 原因), ...]
+
+        模式只转小写一次，种子列表只遍历一次，每个种子按第一个命中的模式处理。
+        多个模式时先用合并后的忽略大小写正则在原名称上筛掉不命中的种子，只为命中的种子转小写。
+        """
         logger = get_logger()
         deleted_count = 0
+        own_batch = reannounce_batch is None
+        if own_batch:
+            reannounce_batch = []
+        patterns = [(p.lower(), delete_files, reason) for p, delete_files, reason in name_tasks]
+        combined = (re.compile("|".join(re.escape(p[0]) for p in patterns), re.IGNORECASE).search
+                    if len(patterns) > 1 else None)
         
         try:
-            torrents = self.client.torrents_info()
+            if torrents is None:
+                torrents = self.client.torrents_info(SIMPLE_RESPONSES=True)
             for t in torrents:
-                name = getattr(t, 'name', '')
-                if name_pattern.lower() in name.lower():
-                    ratio = getattr(t, 'ratio', 0) or 0
-                    seeding_time = getattr(t, 'seeding_time', 0) or 0
-                    size = getattr(t, 'total_size', 0) or 0
-                    uploaded = getattr(t, 'uploaded', 0) or 0
-                    downloaded = getattr(t, 'completed', 0) or getattr(t, 'downloaded', 0) or 0
+                name = t.get('name') or ''
+                if combined is not None and not combined(name):
+                    continue
+                nl = name.lower()
+                hit = next((p for p in patterns if p[0] in nl), None)
+                if hit:
+                    _, delete_files, reason = hit
+                    _, ratio, seeding_time, size, uploaded, downloaded = _torrent_meta(t)
                     
-                    self._schedule_delete(t.hash, name, delete_files, reason, 
-                                         ratio, seeding_time, size, uploaded, downloaded)
+                    self._schedule_delete(t['hash'], name, delete_files, reason, 
+                                         ratio, seeding_time, size, uploaded, downloaded, reannounce_batch)
                     deleted_count += 1
         
         except Exception as e:
             logger.error(f"按名称删除失败: {e}")
         
+        if own_batch:
+            self._flush_reannounce(reannounce_batch)
         return deleted_count
     
     def _delete_torrent(self, torrent_hash: str, name: str, delete_files: bool, 
@@ -640,45 +1020,47 @@ class CleanupModule:
             return result
 
         delete_files = self.config.cleanup_delete_files
-        tracker_keyword = self.config.cleanup_tracker_keyword
+        tracker_keyword = (self.config.cleanup_tracker_keyword or '').lower()
+        tracker_hits: Dict[str, bool] = {}
+        protected = self._protected_hashes
+        pending = self._pending_delete
 
         try:
             free_gb = self._get_free_space_gb()
-            torrents = self.client.torrents_info()
+            if free_gb is None:
+                result['errors'].append("获取剩余空间失败")
+                return result
+            # 规则表只取一次，并按当前剩余空间预先筛掉不可能命中的规则
+            up_rules, dl_rules = (tuple(r for r in rules if free_gb < r[1]) for rules in self._space_rules())
+            torrents = self.client.torrents_info(SIMPLE_RESPONSES=True)
             result['checked'] = len(torrents)
             matched_count = 0
+            reannounce_batch: List[Tuple[str, str]] = []
 
             for t in torrents:
                 try:
-                    # 检查保护列表
-                    if t.hash in self._protected_hashes:
+                    # 检查保护列表 / 是否已在待删除队列
+                    h = t['hash']
+                    if h in protected or h in pending:
                         continue
 
-                    # 检查是否已在待删除队列
-                    with self._lock:
-                        if t.hash in self._pending_delete:
-                            continue
-
                     # 获取种子信息
-                    name = getattr(t, 'name', 'Unknown')
-                    ratio = getattr(t, 'ratio', 0) or 0
-                    seeding_time = getattr(t, 'seeding_time', 0) or 0
-                    size = getattr(t, 'total_size', 0) or 0
-                    uploaded = getattr(t, 'uploaded', 0) or 0
-                    downloaded = getattr(t, 'completed', 0) or getattr(t, 'downloaded', 0) or 0
-
-                    # tracker 关键词过滤（可选）
+                    name, ratio, seeding_time, size, uploaded, downloaded = _torrent_meta(t)
+
+                    # tracker 关键词过滤（可选，同一 tracker 只判断一次）
                     if tracker_keyword:
-                        tracker = getattr(t, 'tracker', '') or ''
-                        if tracker_keyword.lower() not in tracker.lower():
+                        tracker = t.get('tracker') or ''
+                        ok = tracker_hits.get(tracker)
+                        if ok is None:
+                            ok = tracker_hits[tracker] = tracker_keyword in tracker.lower()
+                        if not ok:
                             continue
 
-                    state = getattr(t, 'state', '') or ''
-                    if self._is_waiting_state(state):
+                    if _state_lc(t) in self._waiting_states:
                         continue
 
-                    hit_u, reason_u, pri_u, _ = self._check_upload_space_rules(t, free_gb)
-                    hit_d, reason_d, pri_d, _ = self._check_download_space_rules(t, free_gb)
+                    hit_u, reason_u, pri_u, _ = self._check_upload_space_rules(t, free_gb, up_rules)
+                    hit_d, reason_d, pri_d, _ = self._check_download_space_rules(t, free_gb, dl_rules)
 
                     if hit_u or hit_d:
                         if hit_u and (not hit_d or pri_u <= pri_d):
@@ -686,14 +1068,15 @@ class CleanupModule:
                         else:
                             space_reason = reason_d
                         self._schedule_delete(
-                            t.hash, name, delete_files, space_reason,
-                            ratio, seeding_time, size, uploaded, downloaded
+                            h, name, delete_files, space_reason,
+                            ratio, seeding_time, size, uploaded, downloaded, reannounce_batch
                         )
                         matched_count += 1
 
                 except Exception as e:
                     result['errors'].append(f"检查种子失败: {e}")
 
+            self._flush_reannounce(reannounce_batch)
             result['matched'] = matched_count
             result['pending'] = len(self._pending_delete)
             result['success'] = True
@@ -716,7 +1099,7 @@ class CleanupModule:
             'tracker_keyword': self.config.cleanup_tracker_keyword,
             'protected_count': len(self._protected_hashes),
             'pending_count': len(self._pending_delete),
-            'history_count': len(self.db.get_cleanup_history(1000)),
+            'history_count': self.db.count_cleanup_history(),
             'free_space_gb': free_space,
             'space_rules': {
                 'rule1_gb': self.config.cleanup_space_rule1_gb,
@@ -4,14 +4,52 @@ qBit Smart Limit - 配置模块
 """
 
 import os
-import json
-from dataclasses import dataclass, field
-from typing import Optional, Tuple
+import sys
+from dataclasses import dataclass, field, fields, replace
+from typing import Optional, Tuple, Dict
 
-from .utils import C
+from .utils import C, json_loads, json_dumps
 
 
-@dataclass
+# 已解析的配置文件：路径 -> ((mtime_ns, size), Config)，文件未变化时跳过读取和解析
+_CACHE: Dict[str, Tuple[Tuple[int, int], 'Config']] = {}
+
+# 可通过 TG 命令在数据库中覆盖的字段（runtime_config 键为 override_<attr>）
+_OVERRIDE_ATTRS = ('host', 'username', 'password')
+
+
+# 字段类型转换：值已是目标类型时直接返回，避免多余的 str()/int() 调用
+def _s(d: dict, k: str, dflt='') -> str:
+    v = d.get(k, dflt)
+    if v is None: v = dflt
+    return v.strip() if type(v) is str else str(v).strip()
+
+
+def _i(d: dict, k: str, dflt: int = 0) -> int:
+    v = d.get(k)
+    return v if type(v) is int and v else int(v or dflt)
+
+
+def _f(d: dict, k: str, dflt: float = 0.0) -> float:
+    v = d.get(k)
+    return v if type(v) is float and v else float(v or dflt)
+
+
+def _b(d: dict, k: str, dflt: bool = False) -> bool:
+    v = d.get(k, dflt)
+    return v if type(v) is bool else bool(v)
+
+
+def _pick(cast, sec: dict, nkey: str, d: dict, flat: str, dflt):
+    """嵌套键 (subscription.x / cleanup.x) 优先，其次扁平键，按 cast 转换"""
+    return cast(sec, nkey, dflt) if nkey in sec else cast(d, flat, dflt)
+
+
+# Python 3.10+ 用 __slots__ 去掉实例 __dict__；旧版本系统 python3 退回普通 dataclass
+_DC_OPTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DC_OPTS)
 class Config:
     host: str = "http://127.0.0.1:8080"
     username: str = "admin"
@@ -77,82 +115,25 @@ class Config:
     @staticmethod
     def load(path: str, db: 'Database' = None) -> Tuple[Optional['Config'], Optional[str]]:
         try:
-            if not os.path.exists(path):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
                 return None, f"配置文件不存在: {path}"
             
-            mtime = os.path.getmtime(path)
-            
-            with open(path, 'r', encoding='utf-8') as f:
-                d = json.load(f)
-            
-            # 支持嵌套配置结构 (subscription.* 和 cleanup.*)
-            sub = d.get('subscription', {}) if isinstance(d.get('subscription'), dict) else {}
-            clean = d.get('cleanup', {}) if isinstance(d.get('cleanup'), dict) else {}
-            
-            # 获取RSS URL - 支持新的feeds数组结构和旧的单URL结构
-            rss_url = ''
-            if sub.get('feeds') and isinstance(sub['feeds'], list) and len(sub['feeds']) > 0:
-                # 新结构: subscription.feeds[0].url
-                first_feed = sub['feeds'][0]
-                if isinstance(first_feed, dict):
-                    rss_url = str(first_feed.get('url', '')).strip()
-            elif sub.get('rss_url'):
-                # 旧结构: subscription.rss_url
-                rss_url = str(sub.get('rss_url', '')).strip()
+            key = (st.st_mtime_ns, st.st_size)
+            cached = _CACHE.get(path)
+            if cached and cached[0] == key:
+                # 返回副本：调用方会就地修改（运行时覆盖、TG 命令）
+                cfg = replace(cached[1])
             else:
-                # 扁平结构: subscription_rss_url
-                rss_url = str(d.get('subscription_rss_url', '')).strip()
+                cfg = Config._parse(path, st.st_mtime)
+                _CACHE[path] = (key, replace(cfg))
             
-            cfg = Config(
-                host=str(d.get('host', 'http://127.0.0.1:8080')).strip(),
-                username=str(d.get('username', 'admin')).strip(),
-                password=str(d.get('password', '')),
-                target_speed_kib=int(d.get('target_speed_kib', 51200) or 51200),
-                safety_margin=float(d.get('safety_margin', 0.98) or 0.98),
-                log_level=str(d.get('log_level', 'INFO')).upper(),
-                target_tracker_keyword=str(d.get('target_tracker_keyword', '')).strip(),
-                exclude_tracker_keyword=str(d.get('exclude_tracker_keyword', '')).strip(),
-                telegram_bot_token=str(d.get('telegram_bot_token', '')).strip(),
-                telegram_chat_id=str(d.get('telegram_chat_id', '')).strip(),
-                max_physical_speed_kib=int(d.get('max_physical_speed_kib', 0) or 0),
-                api_rate_limit=int(d.get('api_rate_limit', 20) or 20),
-                u2_cookie=str(d.get('u2_cookie', '')).strip(),
-                proxy=str(d.get('proxy', '')).strip(),
-                peer_list_enabled=bool(d.get('peer_list_enabled', True)),
-                enable_dl_limit=bool(d.get('enable_dl_limit', True)),
-                enable_reannounce_opt=bool(d.get('enable_reannounce_opt', True)),
-                # 订阅模块 - 支持嵌套和扁平结构
-                subscription_enabled=bool(sub.get('enabled', d.get('subscription_enabled', False))),
-                subscription_interval=int(sub.get('interval_seconds', d.get('subscription_interval', 300)) or 300),
-                subscription_rss_url=rss_url,
-                subscription_download_path=str(sub.get('save_path', d.get('subscription_download_path', ''))).strip(),
-                subscription_category=str(sub.get('category', d.get('subscription_category', ''))).strip(),
-                subscription_paused=bool(sub.get('paused', d.get('subscription_paused', False))),
-                subscription_first_last_piece=bool(sub.get('first_last_piece', d.get('subscription_first_last_piece', False))),
-                # 删种模块 - 支持嵌套和扁平结构
-                cleanup_enabled=bool(clean.get('enabled', d.get('cleanup_enabled', False))),
-                cleanup_interval=int(clean.get('interval_seconds', d.get('cleanup_interval', 600)) or 600),
-                cleanup_delete_files=bool(clean.get('delete_files', d.get('cleanup_delete_files', False))),
-                cleanup_tracker_keyword=str(clean.get('tracker_keyword', d.get('cleanup_tracker_keyword', ''))).strip(),
-                cleanup_reannounce_before_delete=bool(clean.get('reannounce_before_delete', d.get('cleanup_reannounce_before_delete', True))),
-                cleanup_reannounce_wait=int(clean.get('reannounce_wait', d.get('cleanup_reannounce_wait', 5)) or 5),
-                # 基于剩余空间的删种规则
-                cleanup_space_rule1_gb=int(d.get('cleanup_space_rule1_gb', 10) or 10),
-                cleanup_space_rule1_upload_kib=int(d.get('cleanup_space_rule1_upload_kib', 1024) or 1024),
-                cleanup_space_rule1_download_kib=int(d.get('cleanup_space_rule1_download_kib', 1024) or 1024),
-                cleanup_space_rule2_gb=int(d.get('cleanup_space_rule2_gb', 20) or 20),
-                cleanup_space_rule2_upload_kib=int(d.get('cleanup_space_rule2_upload_kib', 512) or 512),
-                cleanup_space_rule2_download_kib=int(d.get('cleanup_space_rule2_download_kib', 512) or 512),
-                cleanup_space_rule3_gb=int(d.get('cleanup_space_rule3_gb', 5) or 5),
-                cleanup_space_rule3_upload_kib=int(d.get('cleanup_space_rule3_upload_kib', 5120) or 5120),
-                cleanup_space_rule3_download_kib=int(d.get('cleanup_space_rule3_download_kib', 5120) or 5120),
-                _mtime=mtime
-            )
-            
-            # 应用数据库中的运行时覆盖配置
+            # 应用数据库中的运行时覆盖配置（每次都读，覆盖值可能在文件未变时更新）
             if db:
-                for param, attr in [('host', 'host'), ('username', 'username'), ('password', 'password')]:
-                    override = db.get_runtime_config(f"override_{attr}")
+                overrides = db.get_runtime_configs(f"override_{attr}" for attr in _OVERRIDE_ATTRS)
+                for attr in _OVERRIDE_ATTRS:
+                    override = overrides.get(f"override_{attr}")
                     if override:
                         setattr(cfg, attr, override)
             
@@ -160,55 +141,86 @@ class Config:
         except Exception as e:
             return None, str(e)
     
+    @staticmethod
+    def _parse(path: str, mtime: float) -> 'Config':
+        """读取并解析配置文件（不含数据库覆盖）"""
+        with open(path, 'rb') as f:
+            d = json_loads(f.read())
+        
+        # 支持嵌套配置结构 (subscription.* 和 cleanup.*)
+        sub = d.get('subscription', {}) if isinstance(d.get('subscription'), dict) else {}
+        clean = d.get('cleanup', {}) if isinstance(d.get('cleanup'), dict) else {}
+        
+        # 获取RSS URL - 支持新的feeds数组结构和旧的单URL结构
+        rss_url = ''
+        if sub.get('feeds') and isinstance(sub['feeds'], list) and len(sub['feeds']) > 0:
+            # 新结构: subscription.feeds[0].url
+            first_feed = sub['feeds'][0]
+            if isinstance(first_feed, dict):
+                rss_url = _s(first_feed, 'url')
+        elif sub.get('rss_url'):
+            # 旧结构: subscription.rss_url
+            rss_url = _s(sub, 'rss_url')
+        else:
+            # 扁平结构: subscription_rss_url
+            rss_url = _s(d, 'subscription_rss_url', '')
+        
+        return Config(
+            host=_s(d, 'host', 'http://127.0.0.1:8080'),
+            username=_s(d, 'username', 'admin'),
+            password=str(d.get('password', '')),
+            target_speed_kib=_i(d, 'target_speed_kib', 51200),
+            safety_margin=_f(d, 'safety_margin', 0.98),
+            log_level=_s(d, 'log_level', 'INFO').upper(),
+            target_tracker_keyword=_s(d, 'target_tracker_keyword', ''),
+            exclude_tracker_keyword=_s(d, 'exclude_tracker_keyword', ''),
+            telegram_bot_token=_s(d, 'telegram_bot_token', ''),
+            telegram_chat_id=_s(d, 'telegram_chat_id', ''),
+            max_physical_speed_kib=_i(d, 'max_physical_speed_kib', 0),
+            api_rate_limit=_i(d, 'api_rate_limit', 20),
+            u2_cookie=_s(d, 'u2_cookie', ''),
+            proxy=_s(d, 'proxy', ''),
+            peer_list_enabled=_b(d, 'peer_list_enabled', True),
+            enable_dl_limit=_b(d, 'enable_dl_limit', True),
+            enable_reannounce_opt=_b(d, 'enable_reannounce_opt', True),
+            # 订阅模块 - 支持嵌套和扁平结构
+            subscription_enabled=_pick(_b, sub, 'enabled', d, 'subscription_enabled', False),
+            subscription_interval=_pick(_i, sub, 'interval_seconds', d, 'subscription_interval', 300),
+            subscription_rss_url=rss_url,
+            subscription_download_path=_pick(_s, sub, 'save_path', d, 'subscription_download_path', ''),
+            subscription_category=_pick(_s, sub, 'category', d, 'subscription_category', ''),
+            subscription_paused=_pick(_b, sub, 'paused', d, 'subscription_paused', False),
+            subscription_first_last_piece=_pick(_b, sub, 'first_last_piece', d, 'subscription_first_last_piece', False),
+            # 删种模块 - 支持嵌套和扁平结构
+            cleanup_enabled=_pick(_b, clean, 'enabled', d, 'cleanup_enabled', False),
+            cleanup_interval=_pick(_i, clean, 'interval_seconds', d, 'cleanup_interval', 600),
+            cleanup_delete_files=_pick(_b, clean, 'delete_files', d, 'cleanup_delete_files', False),
+            cleanup_tracker_keyword=_pick(_s, clean, 'tracker_keyword', d, 'cleanup_tracker_keyword', ''),
+            cleanup_reannounce_before_delete=_pick(_b, clean, 'reannounce_before_delete', d, 'cleanup_reannounce_before_delete', True),
+            cleanup_reannounce_wait=_pick(_i, clean, 'reannounce_wait', d, 'cleanup_reannounce_wait', 5),
+            # 基于剩余空间的删种规则
+            cleanup_space_rule1_gb=_i(d, 'cleanup_space_rule1_gb', 10),
+            cleanup_space_rule1_upload_kib=_i(d, 'cleanup_space_rule1_upload_kib', 1024),
+            cleanup_space_rule1_download_kib=_i(d, 'cleanup_space_rule1_download_kib', 1024),
+            cleanup_space_rule2_gb=_i(d, 'cleanup_space_rule2_gb', 20),
+            cleanup_space_rule2_upload_kib=_i(d, 'cleanup_space_rule2_upload_kib', 512),
+            cleanup_space_rule2_download_kib=_i(d, 'cleanup_space_rule2_download_kib', 512),
+            cleanup_space_rule3_gb=_i(d, 'cleanup_space_rule3_gb', 5),
+            cleanup_space_rule3_upload_kib=_i(d, 'cleanup_space_rule3_upload_kib', 5120),
+            cleanup_space_rule3_download_kib=_i(d, 'cleanup_space_rule3_download_kib', 5120),
+            _mtime=mtime
+        )
+    
     def save(self, path: str) -> bool:
         """保存配置到文件"""
         try:
-            data = {
-                'host': self.host,
-                'username': self.username,
-                'password': self.password,
-                'target_speed_kib': self.target_speed_kib,
-                'safety_margin': self.safety_margin,
-                'log_level': self.log_level,
-                'target_tracker_keyword': self.target_tracker_keyword,
-                'exclude_tracker_keyword': self.exclude_tracker_keyword,
-                'telegram_bot_token': self.telegram_bot_token,
-                'telegram_chat_id': self.telegram_chat_id,
-                'max_physical_speed_kib': self.max_physical_speed_kib,
-                'api_rate_limit': self.api_rate_limit,
-                'u2_cookie': self.u2_cookie,
-                'proxy': self.proxy,
-                'peer_list_enabled': self.peer_list_enabled,
-                'enable_dl_limit': self.enable_dl_limit,
-                'enable_reannounce_opt': self.enable_reannounce_opt,
-                # 订阅模块
-                'subscription_enabled': self.subscription_enabled,
-                'subscription_interval': self.subscription_interval,
-                'subscription_rss_url': self.subscription_rss_url,
-                'subscription_download_path': self.subscription_download_path,
-                'subscription_category': self.subscription_category,
-                'subscription_paused': self.subscription_paused,
-                'subscription_first_last_piece': self.subscription_first_last_piece,
-                # 删种模块
-                'cleanup_enabled': self.cleanup_enabled,
-                'cleanup_interval': self.cleanup_interval,
-                'cleanup_delete_files': self.cleanup_delete_files,
-                'cleanup_tracker_keyword': self.cleanup_tracker_keyword,
-                'cleanup_reannounce_before_delete': self.cleanup_reannounce_before_delete,
-                'cleanup_reannounce_wait': self.cleanup_reannounce_wait,
-                # 基于剩余空间的删种规则
-                'cleanup_space_rule1_gb': self.cleanup_space_rule1_gb,
-                'cleanup_space_rule1_upload_kib': self.cleanup_space_rule1_upload_kib,
-                'cleanup_space_rule1_download_kib': self.cleanup_space_rule1_download_kib,
-                'cleanup_space_rule2_gb': self.cleanup_space_rule2_gb,
-                'cleanup_space_rule2_upload_kib': self.cleanup_space_rule2_upload_kib,
-                'cleanup_space_rule2_download_kib': self.cleanup_space_rule2_download_kib,
-                'cleanup_space_rule3_gb': self.cleanup_space_rule3_gb,
-                'cleanup_space_rule3_upload_kib': self.cleanup_space_rule3_upload_kib,
-                'cleanup_space_rule3_download_kib': self.cleanup_space_rule3_download_kib,
-            }
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            data = {k: getattr(self, k) for k in _SAVE_FIELDS}
+            with open(path, 'wb') as f:
+                f.write(json_dumps(data, indent=True))
             return True
         except Exception:
             return False
+
+
+# 写入配置文件的字段（按声明顺序，不含内部字段）
+_SAVE_FIELDS = tuple(f.name for f in fields(Config) if not f.name.startswith('_'))
@@ -24,10 +24,14 @@ class PIDController:
         self._integral = 0.0; self._last_error = 0.0; self._last_time = 0.0
         self._last_output = 1.0; self._initialized = False
         self._integral_limit = 0.3; self._derivative_filter = 0.0
+        self.headroom = C.PID_PARAMS['steady']['headroom']; self._phase = ''
     
     def set_phase(self, phase: str):
+        # 阶段不变时跳过参数表查找
+        if phase == self._phase: return
         params = C.PID_PARAMS.get(phase, C.PID_PARAMS['steady'])
         self.kp, self.ki, self.kd = params['kp'], params['ki'], params['kd']
+        self.headroom = params['headroom']; self._phase = phase
     
     def update(self, setpoint: float, measured: float, now: float) -> float:
         error = safe_div(setpoint - measured, max(setpoint, 1), 0)
@@ -206,6 +210,9 @@ precision_tracker = PrecisionTracker()
 # ════════════════════════════════════════════════════════════════════════════════
 # 精确限速控制器
 # ════════════════════════════════════════════════════════════════════════════════
+_SMOOTH_FACTORS = {'finish': 0.5, 'steady': 0.7}
+
+
 class PrecisionLimitController:
     def __init__(self):
         self.kalman = ExtendedKalman()
@@ -238,19 +245,13 @@ class PrecisionLimitController:
         pid_output = self.pid.update(ideal, current_speed, now)
         debug['pid_output'] = pid_output
         
-        headroom = C.PID_PARAMS.get(phase, C.PID_PARAMS['steady'])['headroom']
-        base_limit = int(ideal * pid_output * headroom)
+        base_limit = int(ideal * pid_output * self.pid.headroom)
         
         limit = AdaptiveQuantizer.quantize(base_limit, phase, current_speed, adjusted_target, trend)
         
         # 平滑限速变化
         if self._smooth_limit > 0:
-            if phase == 'finish':
-                smooth_factor = 0.5
-            elif phase == 'steady':
-                smooth_factor = 0.7
-            else:
-                smooth_factor = 0.85
+            smooth_factor = _SMOOTH_FACTORS.get(phase, 0.85)
             limit = int(limit * (1 - smooth_factor) + self._smooth_limit * smooth_factor)
         
         self._smooth_limit = limit
@@ -614,6 +615,14 @@ class TorrentState:
             'last_announce_time': self.last_announce_time
         }
     
+    def to_db_row(self) -> tuple:
+        """转换为 torrent_states 表的一行（列顺序见 Database._SAVE_STATE_SQL）"""
+        return (self.hash, self.name, self.tid, self.promotion,
+                self.publish_time, self.cycle_index, self.cycle_start,
+                self.cycle_start_uploaded, 1 if self.cycle_synced else 0,
+                self.cycle_interval, self.total_uploaded_start,
+                self.session_start_time, self.last_announce_time, wall_time())
+    
     def load_from_db(self, data: dict):
         """从数据库加载状态"""
         if not data: return
@@ -6,20 +6,41 @@ SQLite 数据持久化
 
 import sqlite3
 import threading
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 from .utils import C, wall_time
 
 
 class Database:
+    # 每个连接都需设置的 PRAGMA（journal_mode=WAL 持久化在库文件中，仅初始化时设置）；
+    # 连接用完即关，cache_size/mmap_size 之类的缓存设置不起作用，不设置
+    _CONN_PRAGMAS = (
+        'PRAGMA synchronous=NORMAL',
+        'PRAGMA busy_timeout=5000',
+    )
+    
+    _SAVE_STATE_SQL = '''INSERT OR REPLACE INTO torrent_states 
+                (hash, name, tid, promotion, publish_time, cycle_index, cycle_start, 
+                 cycle_start_uploaded, cycle_synced, cycle_interval, total_uploaded_start,
+                 session_start_time, last_announce_time, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+    
     def __init__(self, db_path: str = None):
         self.db_path = db_path or C.DB_PATH
         self._lock = threading.Lock()
         self._init_db()
     
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        for pragma in self._CONN_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
     def _init_db(self):
         with self._lock:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA wal_autocheckpoint=1000')
             c = conn.cursor()
             
             # 种子状态表
@@ -81,24 +102,24 @@ class Database:
     
     def save_torrent_state(self, state: 'TorrentState'):
         with self._lock:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             c = conn.cursor()
-            c.execute('''INSERT OR REPLACE INTO torrent_states 
-                (hash, name, tid, promotion, publish_time, cycle_index, cycle_start, 
-                 cycle_start_uploaded, cycle_synced, cycle_interval, total_uploaded_start,
-                 session_start_time, last_announce_time, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                (state.hash, state.name, state.tid, state.promotion,
-                 state.publish_time, state.cycle_index, state.cycle_start,
-                 state.cycle_start_uploaded, 1 if state.cycle_synced else 0,
-                 state.cycle_interval, state.total_uploaded_start,
-                 state.session_start_time, state.last_announce_time, wall_time()))
+            c.execute(self._SAVE_STATE_SQL, state.to_db_row())
             conn.commit()
             conn.close()
     
+    def save_torrent_rows(self, rows: List[tuple]):
+        """单事务批量保存种子状态行（见 TorrentState.to_db_row）"""
+        if not rows: return
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(self._SAVE_STATE_SQL, rows)
+            conn.close()
+    
     def load_torrent_state(self, torrent_hash: str) -> Optional[dict]:
         with self._lock:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             c = conn.cursor()
             c.execute('SELECT * FROM torrent_states WHERE hash = ?', (torrent_hash,))
             row = c.fetchone()
@@ -115,7 +136,7 @@ class Database:
     
     def save_stats(self, stats: 'Stats'):
         with self._lock:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             c = conn.cursor()
             c.execute('''INSERT OR REPLACE INTO stats 
                 (id, total_cycles, success_cycles, precision_cycles, total_uploaded, start_time, updated_at)
@@ -126,7 +147,7 @@ class Database:
     
     def load_stats(self) -> Optional[dict]:
         with self._lock:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             c = conn.cursor()
             c.execute('SELECT * FROM stats WHERE id = 1')
             row = c.fetchone()
@@ -140,7 +161,7 @@ class Database:
     
     def save_runtime_config(self, key: str, value: str):
         with self._lock:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             c = conn.cursor()
             c.execute('INSERT OR REPLACE INTO runtime_config (key, value, updated_at) VALUES (?, ?, ?)',
                       (key, value, wall_time()))
@@ -149,16 +170,28 @@ class Database:
     
     def get_runtime_config(self, key: str) -> Optional[str]:
         with self._lock:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             c = conn.cursor()
             c.execute('SELECT value FROM runtime_config WHERE key = ?', (key,))
             row = c.fetchone()
             conn.close()
             return row[0] if row else None
     
+    def get_runtime_configs(self, keys) -> Dict[str, str]:
+        """一次查询读取多个运行时配置，返回存在的 key -> value"""
+        keys = tuple(keys)
+        if not keys: return {}
+        with self._lock:
+            conn = self._connect()
+            c = conn.cursor()
+            c.execute(f'SELECT key, value FROM runtime_config WHERE key IN ({",".join("?" * len(keys))})', keys)
+            rows = c.fetchall()
+            conn.close()
+            return dict(rows)
+    
     def delete_torrent_state(self, torrent_hash: str):
         with self._lock:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             c = conn.cursor()
             c.execute('DELETE FROM torrent_states WHERE hash = ?', (torrent_hash,))
             conn.commit()
@@ -166,7 +199,7 @@ class Database:
     
     def get_all_torrent_hashes(self) -> List[str]:
         with self._lock:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             c = conn.cursor()
             c.execute('SELECT hash FROM torrent_states')
             rows = c.fetchall()
@@ -178,7 +211,7 @@ class Database:
     # ═══════════════════════════════════════════
     def add_subscription_history(self, torrent_hash: str, name: str, source: str = ""):
         with self._lock:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             c = conn.cursor()
             c.execute('INSERT OR IGNORE INTO subscription_history (hash, name, added_at, source) VALUES (?, ?, ?, ?)',
                       (torrent_hash, name, wall_time(), source))
@@ -187,7 +220,7 @@ class Database:
     
     def is_subscribed(self, torrent_hash: str) -> bool:
         with self._lock:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             c = conn.cursor()
             c.execute('SELECT 1 FROM subscription_history WHERE hash = ?', (torrent_hash,))
             row = c.fetchone()
@@ -196,7 +229,7 @@ class Database:
     
     def get_subscription_history(self, limit: int = 50) -> List[dict]:
         with self._lock:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             c = conn.cursor()
             c.execute('SELECT hash, name, added_at, source FROM subscription_history ORDER BY added_at DESC LIMIT ?', (limit,))
             rows = c.fetchall()
@@ -206,18 +239,34 @@ class Database:
     # ═══════════════════════════════════════════
     # 删种模块相关
     # ═══════════════════════════════════════════
+    _ADD_CLEANUP_SQL = 'INSERT OR REPLACE INTO cleanup_history (hash, name, deleted_at, reason, ratio, seeding_time) VALUES (?, ?, ?, ?, ?, ?)'
+    
     def add_cleanup_history(self, torrent_hash: str, name: str, reason: str, ratio: float, seeding_time: float):
+        self.add_cleanup_history_many([(torrent_hash, name, reason, ratio, seeding_time)])
+    
+    def add_cleanup_history_many(self, rows: List[tuple]):
+        """单事务批量写删种历史，rows 为 (hash, name, reason, ratio, seeding_time)"""
+        if not rows: return
+        now = wall_time()
         with self._lock:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
+            with conn:
+                conn.executemany(self._ADD_CLEANUP_SQL,
+                                 [(h, name, now, reason, ratio, st) for h, name, reason, ratio, st in rows])
+            conn.close()
+    
+    def count_cleanup_history(self) -> int:
+        with self._lock:
+            conn = self._connect()
             c = conn.cursor()
-            c.execute('INSERT OR REPLACE INTO cleanup_history (hash, name, deleted_at, reason, ratio, seeding_time) VALUES (?, ?, ?, ?, ?, ?)',
-                      (torrent_hash, name, wall_time(), reason, ratio, seeding_time))
-            conn.commit()
+            c.execute('SELECT COUNT(*) FROM cleanup_history')
+            count = c.fetchone()[0]
             conn.close()
+            return count
     
     def get_cleanup_history(self, limit: int = 50) -> List[dict]:
         with self._lock:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             c = conn.cursor()
             c.execute('SELECT hash, name, deleted_at, reason, ratio, seeding_time FROM cleanup_history ORDER BY deleted_at DESC LIMIT ?', (limit,))
             rows = c.fetchall()
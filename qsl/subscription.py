@@ -9,7 +9,7 @@ import json
 import time
 import hashlib
 import threading
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Callable
 from datetime import datetime
 import xml.etree.ElementTree as ET
 
@@ -40,7 +40,10 @@ class SubscriptionModule:
         self._lock = threading.Lock()
         
         # 任务文件路径
-        self.task_file = os.path.join(os.path.dirname(config._mtime and "" or C.SUBSCRIPTION_TASK_FILE), C.SUBSCRIPTION_TASK_FILE)
+        self.task_file = C.SUBSCRIPTION_TASK_FILE
+        
+        # 添加种子后的回调（如唤醒删种模块重新检查空间）
+        self.on_added: Optional[Callable[[], None]] = None
         
         # 内存中的已处理hash集合
         self._processed_hashes = set()
@@ -295,6 +298,8 @@ class SubscriptionModule:
                 )
             
             logger.info(f"📥 添加种子: {torrent_name[:40]} ({source})")
+            if self.on_added:
+                self.on_added()
             return True
         
         except Exception as e:
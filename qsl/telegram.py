@@ -35,6 +35,7 @@ class TelegramBot:
         # 运行时状态
         self.paused = False
         self.temp_target_kib: Optional[int] = None
+        self.target_version = 0  # 临时目标每次修改 +1，供控制器判断缓存失效
         
         # 下载完成通知追踪
         self._finish_notified = set()
@@ -99,7 +100,12 @@ class TelegramBot:
         try:
             self._queue.put_nowait((msg, tag))
         except queue.Full:
-            pass
+            # 积压时丢弃最旧的一条，保留最新状态，调用方从不阻塞
+            try:
+                self._queue.get_nowait()
+                self._queue.put_nowait((msg, tag))
+            except (queue.Empty, queue.Full):
+                pass
     
     def send_immediate(self, msg: str):
         """立即发送消息（用于命令响应）"""
@@ -124,6 +130,9 @@ class TelegramBot:
                     json={"chat_id": self.chat_id, "text": safe_msg, "parse_mode": "HTML"},
                     timeout=15
                 )
+                # 还有积压消息时间隔发送，避免批量删种等场景触发限流
+                if not self._queue.empty():
+                    self._stop.wait(C.TG_SEND_SPACING)
             except queue.Empty:
                 pass
             except Exception as e:
@@ -306,7 +315,7 @@ class TelegramBot:
             return
         
         old_limit = self.temp_target_kib or (self.controller.config.target_speed_kib if self.controller else 0)
-        self.temp_target_kib = new_limit
+        self.set_temp_target(new_limit)
         
         self.send_immediate(f"""🎯 <b>目标速度已修改</b>
 ━━━━━━━━━━━━━━━━━━━━━
@@ -316,6 +325,11 @@ class TelegramBot:
 ⚠️ 此为临时设置，重启后恢复""")
         get_logger().info(f"🎯 用户修改目标速度: {fmt_speed(old_limit*1024)} → {fmt_speed(new_limit*1024)}")
     
+    def set_temp_target(self, kib: Optional[int]):
+        """设置临时目标速度（None 表示恢复配置值）"""
+        self.temp_target_kib = kib
+        self.target_version += 1
+    
     def _cmd_log(self, args: str):
         try:
             n = int(args) if args else 10
@@ -485,7 +499,7 @@ RSS源: {rss_status}
             if cleanup:
                 status = "▶️ 运行中" if cleanup.running else "⏹️ 已停止"
                 auto_start = "✅" if self.controller.config.cleanup_enabled else "❌"
-                count = len(self.controller.db.get_cleanup_history(100))
+                count = self.controller.db.count_cleanup_history()
 
                 st = cleanup.get_status() or {}
                 interval = st.get('interval', self.controller.config.cleanup_interval)
@@ -776,6 +790,38 @@ RSS源: {rss_status}
 ⏱️ 时间: <code>{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</code>"""
         self.send(msg, f"cleanup_{name[:10]}", 5)
     
+    def cleanup_notify_batch(self, items: List[dict]):
+        """批量删种通知：多个种子合并为一条消息（超过 C.TG_BATCH_ITEMS 个时分条）
+
+        items 字段同 cleanup_notify_detailed 的参数。
+        """
+        if not self.enabled or not items: return
+        if len(items) == 1:
+            self.cleanup_notify_detailed(**items[0])
+            return
+        
+        total = len(items)
+        now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for start in range(0, total, C.TG_BATCH_ITEMS):
+            chunk = items[start:start + C.TG_BATCH_ITEMS]
+            lines = []
+            for i, it in enumerate(chunk, start + 1):
+                files = "🗃️" if it.get('delete_files') else "📎"
+                lines.append(
+                    f"{i}. {files} <b>{escape_html(it['name'][:40])}</b>\n"
+                    f"   📦 <code>{fmt_size(it.get('size', 0))}</code> | 📤 <code>{fmt_size(it.get('uploaded', 0))}</code>"
+                    f" | 📈 <code>{it.get('ratio', 0):.2f}</code>\n"
+                    f"   📝 {it.get('reason', '')}"
+                )
+            body = "\n".join(lines)
+            msg = f"""🗑️ <b>已删除 {total} 个种子</b> ({start + 1}-{start + len(chunk)})
+━━━━━━━━━━━━━━━━━━━━━
+{body}
+
+🗃️ 已删除文件 | 📎 仅移除
+⏱️ 时间: <code>{now_str}</code>"""
+            self.send(msg)
+    
     def shutdown_report(self):
         if not self.enabled: return
         msg = f"""🛑 <b>脚本已停止</b>
@@ -5,14 +5,26 @@ qBit Smart Limit - 工具函数模块
 
 import os
 import re
+import math
 import time
 import logging
 import threading
+import tempfile
+from functools import lru_cache
 from logging.handlers import RotatingFileHandler
-from typing import Optional, List, Deque
+from typing import Optional, List, Deque, NamedTuple
 from datetime import datetime
 from collections import deque
 
+try:
+    import orjson
+    from orjson import JSONDecodeError
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    from json import JSONDecodeError
+    ORJSON_AVAILABLE = False
+
 
 # ════════════════════════════════════════════════════════════════════════════════
 # 常量配置
@@ -36,6 +48,8 @@ class C:
     PROGRESS_PROTECT = 0.90
     
     MIN_LIMIT = 4096
+    LIMIT_HYSTERESIS = 1024          # 限速变化小于 max(该值, 当前值×比例) 时不下发（冲刺阶段除外）
+    LIMIT_HYSTERESIS_RATIO = 0.02
     
     PID_PARAMS = {
         'warmup': {'kp': 0.3, 'ki': 0.05, 'kd': 0.02, 'headroom': 1.03},
@@ -59,6 +73,7 @@ class C:
     }
     
     MAX_REANNOUNCE = 86400
+    API_WORKERS = 8  # qB API 并发请求数上限
     PROPS_CACHE = {"finish": 0.2, "steady": 0.5, "catch": 1.0, "warmup": 2.0}
     LOG_INTERVAL = 20
     CONFIG_CHECK = 30
@@ -80,6 +95,8 @@ class C:
     
     PEER_LIST_CHECK_INTERVAL = 300
     TID_SEARCH_INTERVAL = 60
+    TID_SEARCH_BATCH = 8  # 每批最多并发搜索的 TID 数
+    U2_WORKERS = 4  # U2 网页请求并发上限（避免对站点造成压力）
     
     # 数据库相关
     DB_PATH = "qbit_smart_limit.db"
@@ -87,6 +104,8 @@ class C:
     
     # TG Bot 轮询
     TG_POLL_INTERVAL = 2
+    TG_SEND_SPACING = 0.8       # 连续发送消息的间隔秒数，避免触发 TG 限流
+    TG_BATCH_ITEMS = 20         # 批量通知每条消息最多包含的条目数
     COOKIE_CHECK_INTERVAL = 3600
     
     # 订阅模块
@@ -96,6 +115,49 @@ class C:
     # 删种模块
     CLEANUP_INTERVAL = 300  # 默认300秒检查一次
     CLEANUP_TASK_FILE = "cleanup_tasks.json"
+    CLEANUP_SPACE_TTL = 10      # 剩余空间缓存秒数（删除后立即失效）
+    CLEANUP_PREFS_TTL = 600     # qB 默认保存路径缓存秒数
+    CLEANUP_IO_WORKERS = 2      # 删种模块汇报/删除的后台 I/O 线程数
+    CLEANUP_NICE = 10           # 删种工作线程的 nice 增量（仅 Linux 按线程生效）
+    CLEANUP_NEAR_RATIO = 1.1    # 剩余空间低于规则阈值此倍数时缩短检查间隔
+    CLEANUP_BATCH_MARGIN = 1.1  # 自动删种批量选种时按空间缺口额外留出的余量
+    CLEANUP_BATCH_MAX = 10      # 自动删种单批最多删除的种子数
+
+
+# ════════════════════════════════════════════════════════════════════════════════
+# 种子快照
+# ════════════════════════════════════════════════════════════════════════════════
+class TRow(NamedTuple):
+    """单个种子本周期的字段快照，每周期只从 torrents_info 结果提取一次"""
+    hash: str
+    name: str
+    state: str
+    tracker: str
+    up_speed: int
+    dl_speed: int
+    uploaded: int
+    completed: int
+    total_size: int
+    eta: int
+    added_on: float
+    up_limit: int
+    progress: float  # 0~1，直接取 qB 计算好的进度
+    
+    @classmethod
+    def from_torrent(cls, t: dict) -> 'TRow':
+        # TorrentDictionary 是 dict 子类，直接按键取值，绕过属性访问的 __getattr__ 分派
+        g = t.get
+        completed = g('completed') or g('downloaded') or 0
+        total_size = g('total_size') or 0
+        progress = g('progress')
+        if progress is None:
+            progress = safe_div(completed, total_size, 0)
+        return cls(
+            t['hash'], g('name') or '', g('state') or '', g('tracker') or '',
+            g('upspeed') or 0, g('dlspeed') or 0, g('uploaded') or 0,
+            completed, total_size, g('eta') or 0, g('added_on') or 0,
+            g('up_limit') or -1, progress,
+        )
 
 
 # ════════════════════════════════════════════════════════════════════════════════
@@ -110,6 +172,13 @@ def fmt_size(b: float, precision: int = 2) -> str:
 
 
 def fmt_speed(b: float, precision: int = 1) -> str:
+    # ≥1 KiB/s 时按整字节取整后走缓存（显示精度远粗于 1 B）；B/s 区间和 inf/nan 直接格式化
+    if math.isfinite(b) and abs(b) >= 1024:
+        return _fmt_speed_cached(round(b), precision)
+    return _fmt_speed(b, precision)
+
+
+def _fmt_speed(b: float, precision: int) -> str:
     if b == 0: return "0 B/s"
     for u in ['B/s', 'KiB/s', 'MiB/s', 'GiB/s']:
         if abs(b) < 1024: return f"{b:.{precision}f} {u}"
@@ -117,13 +186,58 @@ def fmt_speed(b: float, precision: int = 1) -> str:
     return f"{b:.{precision}f} TiB/s"
 
 
+_fmt_speed_cached = lru_cache(maxsize=4096)(_fmt_speed)
+
+
 def fmt_duration(s: float) -> str:
-    s = max(0, int(s))
+    return _fmt_duration(max(0, int(s)))
+
+
+@lru_cache(maxsize=4096)
+def _fmt_duration(s: int) -> str:
     if s < 60: return f"{s}s"
     if s < 3600: return f"{s//60}m{s%60}s"
     return f"{s//3600}h{(s%3600)//60}m"
 
 
+def json_loads(data):
+    """解析 JSON（bytes/str），有 orjson 时使用 orjson"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj, indent: bool = False) -> bytes:
+    """序列化为 UTF-8 JSON bytes（不转义中文），有 orjson 时使用 orjson"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+
+def atomic_write(path: str, data: bytes):
+    """先写同目录临时文件再 os.replace，写入中途失败不会留下截断的文件"""
+    path = os.path.realpath(path)  # 符号链接：替换目标文件而不是链接本身
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp',
+                               dir=os.path.dirname(path))  # 新建即为 0600
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            try:
+                # 沿用原文件权限
+                os.fchmod(f.fileno(), os.stat(path).st_mode & 0o7777)
+            except FileNotFoundError:
+                pass
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
 def escape_html(t: str) -> str:
     return str(t).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
 
@@ -190,10 +304,17 @@ class LoggerWrapper:
         self._logger = logger
         self._buffer = buffer
     
-    def info(self, msg): self._logger.info(msg); self._buffer.add(f"[I] {msg}")
-    def warning(self, msg): self._logger.warning(msg); self._buffer.add(f"[W] {msg}")
-    def error(self, msg): self._logger.error(msg); self._buffer.add(f"[E] {msg}")
-    def debug(self, msg): self._logger.debug(msg)
+    # 支持 %-风格参数：info/warning/error 要写入缓冲区，只格式化一次；debug 交给 logging 延迟格式化
+    def info(self, msg, *args):
+        if args: msg = msg % args
+        self._logger.info(msg); self._buffer.add(f"[I] {msg}")
+    def warning(self, msg, *args):
+        if args: msg = msg % args
+        self._logger.warning(msg); self._buffer.add(f"[W] {msg}")
+    def error(self, msg, *args):
+        if args: msg = msg % args
+        self._logger.error(msg); self._buffer.add(f"[E] {msg}")
+    def debug(self, msg, *args): self._logger.debug(msg, *args)
 
 
 def setup_logging(level: str = "INFO") -> logging.Logger:
@@ -216,6 +337,8 @@ def setup_logging(level: str = "INFO") -> logging.Logger:
         fh.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
         log.addHandler(fh)
     except: pass
+    # logger 级别取各 handler 的最低级别，所有 handler 都不接收的级别在 isEnabledFor 处直接短路
+    log.setLevel(min(h.level for h in log.handlers))
     return log
 
 